@@ -1,5 +1,4 @@
 import os
-from datetime import timedelta
 
 
 def get_database_uri():
@@ -66,8 +65,9 @@ class DevelopmentConfig(Config):
 class TestingConfig(Config):
     """Testing configuration"""
     TESTING = True
-    # Use in-memory SQLite for testing
-    SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
+    # Use in-memory SQLite for testing (one shared StaticPool connection); set TEST_DATABASE_URL
+    # to run the suite against a real server instead
+    SQLALCHEMY_DATABASE_URI = os.environ.get('TEST_DATABASE_URL', 'sqlite:///:memory:')
     # Use different Redis DB for testing
     REDIS_DB = 1
     WTF_CSRF_ENABLED = False
@@ -0,0 +1,26 @@
+"""Add optimistic-lock version column to inventory_items
+
+Revision ID: 002_inventory_version
+Revises: 001_initial
+Create Date: 2026-10-15 09:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '002_inventory_version'
+down_revision = '001_initial'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column(
+        'inventory_items',
+        sa.Column('version', sa.Integer(), nullable=False, server_default='0')
+    )
+
+
+def downgrade():
+    op.drop_column('inventory_items', 'version')
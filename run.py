@@ -6,23 +6,27 @@ Flask-based microservice for managing product inventory.
 
 import os
 import logging
-from dotenv import load_dotenv
-
-# Load environment variables
-load_dotenv()
 
 # Import application factory
 from src import create_app
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
-
 logger = logging.getLogger(__name__)
 
 
+def _bootstrap():
+    """Load .env and configure logging; only done when run as a script, not on import."""
+    from dotenv import load_dotenv
+    
+    # Load environment variables
+    load_dotenv()
+    
+    # Configure logging
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+
+
 def main():
     """Main application entry point."""
     # Get environment
@@ -65,4 +69,5 @@ def main():
 
 
 if __name__ == '__main__':
+    _bootstrap()
     main()
@@ -1,5 +1,3 @@
-import os
-import sys
 import logging
 from flask import Flask
 from src.models import db
@@ -17,8 +15,10 @@ def create_app(config_name='default'):
     from dotenv import load_dotenv
     load_dotenv()
     
-    # Set database URI from Dapr secrets (lazy loading)
-    app.config['SQLALCHEMY_DATABASE_URI'] = get_database_uri()
+    # Set database URI from Dapr secrets (lazy loading) unless the config pins one,
+    # e.g. TestingConfig's in-memory SQLite (which Flask-SQLAlchemy serves from one StaticPool connection)
+    if not app.config.get('SQLALCHEMY_DATABASE_URI'):
+        app.config['SQLALCHEMY_DATABASE_URI'] = get_database_uri()
     
     # Initialize W3C Trace Context middleware
     from src.middlewares.trace_context import TraceContextMiddleware
@@ -3,27 +3,40 @@ Home endpoints for inventory service
 """
 
 from flask import Blueprint, jsonify
+from functools import lru_cache
 import os
 
 # Create blueprint for home endpoints
 home_bp = Blueprint('home', __name__)
 
 
+@lru_cache(maxsize=None)
+def _service_identity():
+    """Service name, version and environment; the environment is fixed once the process has started"""
+    return (
+        os.environ.get('NAME', 'inventory-service'),
+        os.environ.get('VERSION', '1.0.0'),
+        os.environ.get('FLASK_ENV', 'development'),
+    )
+
+
 @home_bp.route('/', methods=['GET'])
 def info():
     """Service information endpoint"""
+    name, service_version, environment = _service_identity()
     return jsonify({
-        'service': os.environ.get('NAME', 'inventory-service'),
-        'version': os.environ.get('VERSION', '1.0.0'),
+        'service': name,
+        'version': service_version,
         'description': 'Inventory management microservice for AIOutlet platform',
-        'environment': os.environ.get('FLASK_ENV', 'development'),
+        'environment': environment,
     }), 200
 
 
 @home_bp.route('/version', methods=['GET'])
 def version():
     """Service version endpoint"""
+    name, service_version, _ = _service_identity()
     return jsonify({
-        'version': os.environ.get('VERSION', '1.0.0'),
-        'service': os.environ.get('NAME', 'inventory-service'),
+        'version': service_version,
+        'service': name,
     }), 200
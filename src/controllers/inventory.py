@@ -2,7 +2,7 @@
 Inventory Controller - Handles inventory CRUD operations and stock management
 """
 
-from flask import Blueprint, request, g, jsonify
+from flask import Blueprint, request, g
 from flask_restx import Api, Resource, fields
 from marshmallow import ValidationError
 from src.services import InventoryService
@@ -109,8 +109,8 @@ class InventoryList(Resource):
                 # Publish inventory.created event
                 correlation_id = getattr(g, 'correlation_id', None)
                 event_publisher.publish_inventory_created(
-                    product_id=item.sku,  # Using SKU as identifier
-                    initial_quantity=item.quantity_available,
+                    product_id=item['sku'],  # Using SKU as identifier
+                    initial_quantity=item['quantity_available'],
                     correlation_id=correlation_id
                 )
                 
@@ -217,8 +217,8 @@ class InventoryItem(Resource):
                 # Publish inventory.stock.updated event
                 correlation_id = getattr(g, 'correlation_id', None)
                 event_publisher.publish_stock_updated(
-                    product_id=item.sku,  # Using SKU as identifier
-                    quantity=item.quantity_available,
+                    product_id=item['sku'],  # Using SKU as identifier
+                    quantity=item['quantity_available'],
                     correlation_id=correlation_id
                 )
                 
@@ -354,13 +354,18 @@ class BatchInventoryRetrieval(Resource):
                 inventory_service = InventoryService()
                 result = []
                 
+                # Fetch all exact matches with one query instead of one query per SKU
+                inventory_map = {
+                    item.sku: item
+                    for item in inventory_service.inventory_repo.get_multiple_by_skus(list(set(skus)))
+                } if skus else {}
+                
                 for sku in skus:
                     # Try exact match first
-                    inventory_items = inventory_service.inventory_repo.get_multiple_by_skus([sku])
+                    item = inventory_map.get(sku)
                     
-                    if inventory_items:
+                    if item:
                         # Exact match found - return it
-                        item = inventory_items[0]
                         result.append({
                             'sku': item.sku,
                             'quantityAvailable': item.quantity_available,
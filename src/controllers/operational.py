@@ -3,14 +3,14 @@ Health check endpoints for inventory service
 These endpoints are used by monitoring systems, load balancers, and Kubernetes
 """
 
-from flask import Blueprint, jsonify
-from datetime import datetime
+from flask import Blueprint, jsonify, request
 import os
 import logging
 from src.utils.health_checks import (
     perform_readiness_check, 
     perform_liveness_check, 
-    get_system_metrics
+    get_system_metrics,
+    now_iso
 )
 
 logger = logging.getLogger(__name__)
@@ -25,7 +25,7 @@ def health():
     return jsonify({
         'status': 'healthy',
         'service': os.environ.get('NAME', 'inventory-service'),
-        'timestamp': datetime.utcnow().isoformat() + 'Z',
+        'timestamp': now_iso(),
         'version': os.environ.get('VERSION', '1.0.0'),
         'environment': os.environ.get('FLASK_ENV', 'development'),
     }), 200
@@ -35,7 +35,7 @@ def health():
 def readiness():
     """Readiness probe - checks if service is ready to handle traffic"""
     try:
-        readiness_result = perform_readiness_check()
+        readiness_result = perform_readiness_check(verbose=request.args.get('verbose') == '1')
         
         # Log readiness check results for monitoring
         logger.info('Readiness check performed', extra={
@@ -60,7 +60,7 @@ def readiness():
         return jsonify({
             'status': 'not ready',
             'service': 'inventory-service',
-            'timestamp': datetime.utcnow().isoformat() + 'Z',
+            'timestamp': now_iso(),
             'error': 'Readiness check failed',
             'details': str(e),
         }), 503
@@ -95,7 +95,7 @@ def liveness():
         return jsonify({
             'status': 'unhealthy',
             'service': 'inventory-service',
-            'timestamp': datetime.utcnow().isoformat() + 'Z',
+            'timestamp': now_iso(),
             'error': 'Liveness check failed',
             'details': str(e),
         }), 503
@@ -116,7 +116,7 @@ def metrics():
         logger.error('Metrics collection failed', extra={'error': str(e)})
         return jsonify({
             'service': 'inventory-service',
-            'timestamp': datetime.utcnow().isoformat() + 'Z',
+            'timestamp': now_iso(),
             'error': 'Metrics collection failed',
             'details': str(e),
         }), 500
@@ -23,7 +23,7 @@ def get_inventory_stats():
     Returns:
         JSON with inventory metrics:
         - productsWithStock: Count of items with quantity > 0
-        - lowStockCount: Count of items below reorder level
+        - lowStockCount: Count of in-stock items below reorder level
         - outOfStockCount: Count of items with zero quantity
         - totalInventoryValue: Sum of (quantity * cost_per_unit)
         - totalUnits: Total units across all products
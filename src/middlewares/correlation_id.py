@@ -7,11 +7,12 @@ import logging
 from functools import wraps
 from typing import Optional, Dict, Any
 from contextvars import ContextVar
-from flask import Request, Response, g, request, current_app
+from flask import Response, g, request, current_app
 
 # Context variable to store correlation ID for the current request
 correlation_id_context: ContextVar[str] = ContextVar('correlation_id', default='')
 
+
 class CorrelationIdMiddleware:
     """
     Flask middleware for handling correlation IDs
@@ -99,6 +100,16 @@ class CorrelationIdHelper:
         extra: Optional[Dict[str, Any]] = None
     ) -> None:
         """Log message with correlation ID"""
+        # 'exception' logs at ERROR with the active traceback, like Logger.exception
+        exc_info = level.lower() == 'exception'
+        level_no = logging.ERROR if exc_info else logging.getLevelName(level.upper())
+        if not isinstance(level_no, int):
+            raise ValueError(f"Unknown log level: {level}")
+        
+        # Nothing to build if the record would be dropped anyway
+        if not logger.isEnabledFor(level_no):
+            return
+        
         correlation_id = CorrelationIdHelper.get_correlation_id()
         
         # Prepare log data
@@ -107,11 +118,8 @@ class CorrelationIdHelper:
             **(extra or {})
         }
         
-        # Create formatted message
-        formatted_message = f"[{correlation_id}] {message}"
-        
-        # Log with appropriate level
-        getattr(logger, level.lower())(formatted_message, extra=log_extra)
+        # The message is formatted by the logging framework only when a handler emits it
+        logger.log(level_no, "[%s] %s", correlation_id, message, extra=log_extra, exc_info=exc_info)
     
     @staticmethod
     def with_correlation_context(func):
@@ -6,7 +6,7 @@ import uuid
 import re
 import logging
 from typing import Optional, Tuple
-from flask import Request, Response, g, request, current_app
+from flask import Response, g, request, current_app
 
 # W3C traceparent header format: 00-{trace-id}-{parent-id}-{trace-flags}
 TRACEPARENT_PATTERN = re.compile(
@@ -21,6 +21,10 @@ class InventoryItem(db.Model):
     last_restocked = db.Column(db.DateTime, nullable=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+    version = db.Column(db.Integer, default=0, server_default='0', nullable=False)
+    
+    # Optimistic locking - ORM updates fail with StaleDataError if the row changed underneath
+    __mapper_args__ = {'version_id_col': version}
     
     # Relationships
     reservations = db.relationship('Reservation', backref='inventory_item', lazy=True)
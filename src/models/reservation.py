@@ -31,10 +31,8 @@ class Reservation(db.Model):
     
     @property
     def product_id(self):
-        """Get product_id from associated inventory item"""
-        from src.models.inventory_item import InventoryItem
-        item = InventoryItem.query.filter_by(sku=self.sku).first()
-        return item.product_id if item else None
+        """Product identifier; inventory items are keyed by SKU, which the API exposes as product_id"""
+        return self.sku
     
     def to_dict(self):
         """Convert to dictionary"""
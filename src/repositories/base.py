@@ -87,11 +87,13 @@ class ReservationRepositoryInterface(ABC):
         pass
     
     @abstractmethod
-    def get_expired_reservations(self) -> List[Reservation]:
+    def get_expired_reservations(self, batch_size: Optional[int] = None,
+                                 skip_locked: bool = False) -> List[Reservation]:
         pass
     
     @abstractmethod
-    def delete_expired(self, expired_before: datetime) -> int:
+    def delete_expired(self, expired_before: datetime, chunk_size: int = 1000,
+                       max_chunks: Optional[int] = None) -> int:
         pass
 
     @abstractmethod
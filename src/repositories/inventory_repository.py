@@ -2,23 +2,52 @@
 Inventory Repository Implementation
 """
 
-from typing import List, Optional
+from typing import Dict, List, Optional
 from src.database import db
-from src.models import InventoryItem, StockMovement, StockMovementType
+from src.models import InventoryItem, Reservation, ReservationStatus, StockMovement, StockMovementType
 from datetime import datetime
+from flask import has_request_context, request
 from sqlalchemy.exc import IntegrityError
-from sqlalchemy import or_
+from sqlalchemy import bindparam, or_, case, insert, select, update
 from .base import InventoryRepositoryInterface
 
+# Hot lookup built once; SQLAlchemy's compiled cache then reuses its SQL on every call
+_SELECT_ITEM_BY_SKU = select(InventoryItem).where(InventoryItem.sku == bindparam('sku')).limit(1)
+
 
 class InventoryRepository(InventoryRepositoryInterface):
     """Concrete implementation of inventory repository"""
     
     def get_by_sku(self, sku: str) -> Optional[InventoryItem]:
-        """Get inventory item by SKU"""
-        return InventoryItem.query.filter_by(sku=sku).first()
+        """Get inventory item by SKU (memoized for the current request)"""
+        cache = self._sku_cache()
+        item = cache.get(sku)
+        if item is None:
+            item = db.session.execute(_SELECT_ITEM_BY_SKU, {'sku': sku}).scalars().first()
+            # Only hits are cached so a SKU created later in the request is still found
+            if item is not None:
+                cache[sku] = item
+        return item
     
-
+    @staticmethod
+    def _sku_cache() -> Dict[str, InventoryItem]:
+        """
+        SKU -> item map for the current HTTP request, kept on the request object itself (flask.g
+        lives as long as the app context, which background jobs and CLI tasks hold open across many
+        commits). Outside a request nothing is memoized.
+        """
+        if not has_request_context():
+            return {}
+        cache = getattr(request, '_inventory_sku_cache', None)
+        if cache is None:
+            cache = request._inventory_sku_cache = {}
+        return cache
+    
+    def _invalidate_skus(self, *skus: str) -> None:
+        """Drop cached items after their stock changes"""
+        cache = self._sku_cache()
+        for sku in skus:
+            cache.pop(sku, None)
     
     def get_multiple_by_skus(self, skus: List[str]) -> List[InventoryItem]:
         """Get multiple inventory items by SKUs"""
@@ -53,6 +82,7 @@ class InventoryRepository(InventoryRepositoryInterface):
             
             db.session.delete(item)
             db.session.commit()
+            self._invalidate_skus(sku)
             return True
             
         except Exception as e:
@@ -63,34 +93,36 @@ class InventoryRepository(InventoryRepositoryInterface):
                     reference: str = None, reason: str = None, created_by: str = 'system') -> bool:
         """Update stock quantity and record movement"""
         try:
-            # Get inventory item
-            item = self.get_by_sku(sku)
-            if not item:
-                return False
-            
-            # Update quantities based on movement type
-            if movement_type == StockMovementType.IN:
-                item.quantity_available += quantity_change
-            elif movement_type == StockMovementType.OUT:
-                if item.quantity_available < quantity_change:
+            self._invalidate_skus(sku)
+            if movement_type in (StockMovementType.OUT, StockMovementType.RESERVED, StockMovementType.RELEASED):
+                # Single conditional UPDATE - availability is checked by the database,
+                # so concurrent requests cannot oversell between a read and a write
+                if self._update_stock_bulk({sku: quantity_change}, movement_type) != 1:
+                    if not self.get_by_sku(sku):
+                        db.session.rollback()
+                        return False
+                    if movement_type == StockMovementType.RESERVED:
+                        raise ValueError(f"Insufficient stock to reserve for SKU {sku}")
                     raise ValueError(f"Insufficient stock for SKU {sku}")
-                item.quantity_available -= quantity_change
-            elif movement_type == StockMovementType.RESERVED:
-                if item.quantity_available < quantity_change:
-                    raise ValueError(f"Insufficient stock to reserve for SKU {sku}")
-                item.quantity_available -= quantity_change
-                item.quantity_reserved += quantity_change
-            elif movement_type == StockMovementType.RELEASED:
-                item.quantity_reserved -= quantity_change
-                item.quantity_available += quantity_change
-            elif movement_type == StockMovementType.ADJUSTMENT:
-                item.quantity_available = quantity_change  # Set to absolute value
-            
-            # Ensure quantities don't go negative
-            if item.quantity_available < 0:
-                item.quantity_available = 0
-            if item.quantity_reserved < 0:
-                item.quantity_reserved = 0
+            else:
+                # Get inventory item
+                item = self.get_by_sku(sku)
+                if not item:
+                    return False
+                
+                # Update quantities based on movement type
+                if movement_type == StockMovementType.IN:
+                    item.quantity_available += quantity_change
+                    item.last_restocked = datetime.utcnow()
+                elif movement_type == StockMovementType.ADJUSTMENT:
+                    item.quantity_available = quantity_change  # Set to absolute value
+                
+                # Ensure quantities don't go negative
+                if item.quantity_available < 0:
+                    item.quantity_available = 0
+                
+                # Update timestamp
+                item.updated_at = datetime.utcnow()
             
             # Record stock movement
             movement = StockMovement(
@@ -103,17 +135,146 @@ class InventoryRepository(InventoryRepositoryInterface):
             )
             db.session.add(movement)
             
-            # Update timestamp
-            item.updated_at = datetime.utcnow()
-            if movement_type == StockMovementType.IN:
-                item.last_restocked = datetime.utcnow()
-            
             db.session.commit()
             return True
         except Exception as e:
             db.session.rollback()
             raise e
     
+    def reserve_stock_bulk(self, reservations: List[Reservation], reference: str = None,
+                           reason: str = None, created_by: str = 'system') -> None:
+        """Persist reservations and reserve their stock in a single transaction"""
+        try:
+            self._apply_stock_bulk(self._sum_quantities(reservations), StockMovementType.RESERVED)
+            db.session.add_all(reservations)
+            self._record_movements_bulk(StockMovementType.RESERVED, [
+                (reservation.sku, reservation.quantity, reference, reason)
+                for reservation in reservations
+            ], created_by)
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            raise e
+    
+    def transition_reservations(self, reservations: List[Reservation], status: ReservationStatus,
+                                movement_type: StockMovementType, reason: str = None,
+                                created_by: str = 'system', unexpired_only: bool = False) -> None:
+        """
+        Move pending reservations to a new status and apply their stock movement
+        in a single transaction. ``reason`` is formatted with each reservation's order_id.
+        With ``unexpired_only`` the UPDATE also requires ``expires_at`` to be in the future.
+        """
+        try:
+            now = datetime.utcnow()
+            conditions = [
+                Reservation.id.in_([reservation.id for reservation in reservations]),
+                Reservation.status == ReservationStatus.PENDING
+            ]
+            if unexpired_only:
+                conditions.append(Reservation.expires_at > now)
+            
+            result = db.session.execute(
+                update(Reservation)
+                .where(*conditions)
+                .values(status=status, updated_at=now)
+                .execution_options(synchronize_session=False)
+            )
+            if result.rowcount != len(reservations):
+                raise ValueError("One or more reservations are no longer pending")
+            
+            self._apply_stock_bulk(self._sum_quantities(reservations), movement_type)
+            self._record_movements_bulk(movement_type, [
+                (
+                    reservation.sku,
+                    reservation.quantity,
+                    reservation.order_id,
+                    reason.format(order_id=reservation.order_id) if reason else None
+                )
+                for reservation in reservations
+            ], created_by)
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            raise e
+    
+    @staticmethod
+    def _sum_quantities(reservations: List[Reservation]) -> Dict[str, int]:
+        """Total quantity per SKU so each row is checked against the full amount"""
+        quantities: Dict[str, int] = {}
+        for reservation in reservations:
+            quantities[reservation.sku] = quantities.get(reservation.sku, 0) + reservation.quantity
+        return quantities
+    
+    def _apply_stock_bulk(self, quantities: Dict[str, int], movement_type: StockMovementType) -> None:
+        """Run _update_stock_bulk and raise a descriptive error if any SKU was not updated"""
+        if self._update_stock_bulk(quantities, movement_type) == len(quantities):
+            return
+        
+        available = dict(
+            db.session.query(InventoryItem.sku, InventoryItem.quantity_available)
+            .filter(InventoryItem.sku.in_(quantities))
+            .all()
+        )
+        missing = [sku for sku in quantities if sku not in available]
+        if missing:
+            raise ValueError(f"Product with SKU {', '.join(missing)} not found")
+        
+        short = [sku for sku, quantity in quantities.items() if available[sku] < quantity]
+        raise ValueError(f"Insufficient stock for SKU {', '.join(short or quantities)}")
+    
+    def _update_stock_bulk(self, quantities: Dict[str, int], movement_type: StockMovementType) -> int:
+        """
+        Apply one movement type to many SKUs with a single conditional UPDATE (no commit).
+        Rows without enough stock are not matched; returns the number of rows updated.
+        """
+        self._invalidate_skus(*quantities)
+        requested = case(quantities, value=InventoryItem.sku)
+        conditions = [InventoryItem.sku.in_(quantities)]
+        values = {
+            'updated_at': datetime.utcnow(),
+            # Bump the optimistic-lock version so ORM read-modify-write paths see the change
+            'version': InventoryItem.version + 1
+        }
+        
+        if movement_type == StockMovementType.OUT:
+            conditions.append(InventoryItem.quantity_available >= requested)
+            values['quantity_available'] = InventoryItem.quantity_available - requested
+        elif movement_type == StockMovementType.RESERVED:
+            conditions.append(InventoryItem.quantity_available >= requested)
+            values['quantity_available'] = InventoryItem.quantity_available - requested
+            values['quantity_reserved'] = InventoryItem.quantity_reserved + requested
+        elif movement_type == StockMovementType.RELEASED:
+            values['quantity_available'] = InventoryItem.quantity_available + requested
+            values['quantity_reserved'] = case(
+                (InventoryItem.quantity_reserved > requested, InventoryItem.quantity_reserved - requested),
+                else_=0
+            )
+        else:
+            raise ValueError(f"Unsupported bulk movement type: {movement_type.value}")
+        
+        result = db.session.execute(
+            update(InventoryItem)
+            .where(*conditions)
+            .values(**values)
+            .execution_options(synchronize_session=False)
+        )
+        return result.rowcount
+    
+    def _record_movements_bulk(self, movement_type: StockMovementType, rows: List[tuple],
+                               created_by: str = 'system') -> None:
+        """Insert (sku, quantity, reference, reason) movement rows with one executemany (no commit)"""
+        db.session.execute(insert(StockMovement), [
+            {
+                'sku': sku,
+                'movement_type': movement_type,
+                'quantity': quantity,
+                'reference': reference,
+                'reason': reason,
+                'created_by': created_by
+            }
+            for sku, quantity, reference, reason in rows
+        ])
+    
     def get_low_stock_items(self) -> List[InventoryItem]:
         """Get items below reorder level"""
         return InventoryItem.query.filter(
@@ -144,7 +305,9 @@ class InventoryRepository(InventoryRepositoryInterface):
         """Search inventory items with filters"""
         query = InventoryItem.query
         
-        
+        if kwargs.get('product_ids'):
+            # Items are keyed by SKU, which the API exposes as the product identifier
+            query = query.filter(InventoryItem.sku.in_(kwargs['product_ids']))
         
         if 'low_stock' in kwargs and kwargs['low_stock']:
             query = query.filter(InventoryItem.quantity_available <= InventoryItem.reorder_level)
@@ -162,6 +325,7 @@ class InventoryRepository(InventoryRepositoryInterface):
     def bulk_update(self, updates: List[dict]) -> List[dict]:
         """Bulk update inventory items"""
         results = []
+        now = datetime.utcnow()
         for update in updates:
             try:
                 item = self.get_by_sku(update['sku'])
@@ -169,7 +333,7 @@ class InventoryRepository(InventoryRepositoryInterface):
                     for key, value in update.items():
                         if key != 'sku' and hasattr(item, key):
                             setattr(item, key, value)
-                    item.updated_at = datetime.utcnow()
+                    item.updated_at = now
                     results.append({'sku': update['sku'], 'success': True})
                 else:
                     results.append({'sku': update['sku'], 'success': False, 'error': 'Item not found'})
@@ -198,8 +362,9 @@ class InventoryRepository(InventoryRepositoryInterface):
         return StockMovement.query.filter_by(sku=sku).order_by(StockMovement.created_at.desc()).all()
 
     def count_low_stock(self) -> int:
-        """Count items below reorder level"""
+        """Count items below reorder level that are not out of stock (those are counted separately)"""
         return InventoryItem.query.filter(
+            InventoryItem.quantity_available > 0,
             InventoryItem.quantity_available < InventoryItem.reorder_level
         ).count()
 
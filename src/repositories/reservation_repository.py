@@ -6,7 +6,7 @@ from typing import List, Optional
 from src.database import db
 from src.models import Reservation, ReservationStatus
 from datetime import datetime
-from sqlalchemy import and_
+from sqlalchemy import and_, delete, select, update
 from .base import ReservationRepositoryInterface
 
 
@@ -20,8 +20,12 @@ class ReservationRepository(ReservationRepositoryInterface):
         return reservation
     
     def get_by_id(self, reservation_id: str) -> Optional[Reservation]:
-        """Get reservation by ID"""
-        return Reservation.query.filter_by(id=reservation_id).first()
+        """Get reservation by ID (served from the session identity map when already loaded)"""
+        return db.session.get(Reservation, reservation_id)
+    
+    def get_by_ids(self, reservation_ids: List[str]) -> List[Reservation]:
+        """Get multiple reservations by ID"""
+        return Reservation.query.filter(Reservation.id.in_(reservation_ids)).all()
     
     def get_by_order_id(self, order_id: str) -> List[Reservation]:
         """Get reservations by order ID"""
@@ -38,25 +42,70 @@ class ReservationRepository(ReservationRepositoryInterface):
         db.session.commit()
         return reservation
     
-    def get_expired_reservations(self) -> List[Reservation]:
-        """Get expired pending reservations"""
-        return Reservation.query.filter(
+    def bulk_update_status(self, reservation_ids: List[str], status: ReservationStatus) -> int:
+        """Update status for multiple reservations with a single UPDATE"""
+        result = db.session.execute(
+            update(Reservation)
+            .where(Reservation.id.in_(reservation_ids))
+            .values(status=status, updated_at=datetime.utcnow())
+            .execution_options(synchronize_session=False)
+        )
+        db.session.commit()
+        return result.rowcount
+    
+    def get_expired_reservations(self, batch_size: Optional[int] = None,
+                                 skip_locked: bool = False) -> List[Reservation]:
+        """
+        Get expired pending reservations, longest-expired first (ID breaks ties).
+        With skip_locked the rows are locked (FOR UPDATE SKIP LOCKED) until the caller
+        commits, so concurrent workers each claim a disjoint batch instead of blocking.
+        """
+        query = Reservation.query.filter(
             and_(
                 Reservation.status == ReservationStatus.PENDING,
                 Reservation.expires_at < datetime.utcnow()
             )
-        ).all()
+        ).order_by(Reservation.expires_at, Reservation.id)
+        
+        if batch_size:
+            query = query.limit(batch_size)
+        if skip_locked:
+            query = query.with_for_update(skip_locked=True)
+        
+        return query.all()
     
-    def delete_expired(self, expired_before: datetime) -> int:
-        """Delete expired reservations"""
-        count = Reservation.query.filter(
-            and_(
+    def delete_expired(self, expired_before: datetime, chunk_size: int = 1000,
+                       max_chunks: Optional[int] = None) -> int:
+        """
+        Delete expired reservations in chunks of ``chunk_size`` rows, committing after
+        each one so no single transaction holds a long lock range. ``max_chunks`` caps
+        the work done per call; whatever is left is picked up by the next run.
+        """
+        # DELETE ... LIMIT is MySQL-only, so each chunk selects its IDs with a portable LIMIT
+        chunk_ids = (
+            select(Reservation.id)
+            .where(
                 Reservation.status == ReservationStatus.EXPIRED,
                 Reservation.updated_at < expired_before
             )
-        ).delete()
-        db.session.commit()
-        return count
+            .limit(chunk_size)
+        )
+        
+        total = 0
+        chunks = 0
+        while True:
+            ids = db.session.execute(chunk_ids).scalars().all()
+            if ids:
+                db.session.execute(
+                    delete(Reservation)
+                    .where(Reservation.id.in_(ids))
+                    .execution_options(synchronize_session=False)
+                )
+                db.session.commit()
+            total += len(ids)
+            chunks += 1
+            if len(ids) < chunk_size or (max_chunks and chunks >= max_chunks):
+                return total
 
     def cancel(self, reservation_id: str) -> Optional[Reservation]:
         """Cancel a reservation"""
@@ -71,18 +120,15 @@ class ReservationRepository(ReservationRepositoryInterface):
 
     def bulk_confirm(self, reservation_ids: List[str]) -> List[dict]:
         """Bulk confirm reservations"""
-        results = []
-        for res_id in reservation_ids:
-            try:
-                updated = self.update_status(res_id, ReservationStatus.CONFIRMED)
-                if updated:
-                    results.append({'reservation_id': res_id, 'success': True})
-                else:
-                    results.append({'reservation_id': res_id, 'success': False, 'error': 'Not found'})
-            except Exception as e:
-                results.append({'reservation_id': res_id, 'success': False, 'error': str(e)})
+        found_ids = {r.id for r in self.get_by_ids(reservation_ids)}
+        if found_ids:
+            self.bulk_update_status(list(found_ids), ReservationStatus.CONFIRMED)
         
-        return results
+        return [
+            {'reservation_id': res_id, 'success': True} if res_id in found_ids
+            else {'reservation_id': res_id, 'success': False, 'error': 'Not found'}
+            for res_id in reservation_ids
+        ]
 
     def search(self, **kwargs) -> tuple[List[Reservation], int]:
         """Search reservations with filters"""
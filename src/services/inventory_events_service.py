@@ -7,10 +7,30 @@ from typing import Dict, Any
 from datetime import datetime, timedelta
 import uuid
 
+from sqlalchemy import case, update
+from sqlalchemy.exc import IntegrityError
+
 from src.database import db
-from src.models import InventoryItem, Reservation
+from src.models import InventoryItem, Reservation, ReservationStatus
 from src.utils.event_publisher import event_publisher
 
+# How long stock reserved for an order.created event is held
+ORDER_RESERVATION_TTL = timedelta(hours=24)
+
+# MySQL ER_DUP_ENTRY
+_MYSQL_DUPLICATE_ENTRY = 1062
+
+
+def _is_duplicate_sku(error: IntegrityError) -> bool:
+    """True when error is the unique-constraint violation on inventory_items.sku"""
+    orig = error.orig
+    message = str(orig)
+    duplicate = (
+        (orig.args and orig.args[0] == _MYSQL_DUPLICATE_ENTRY)
+        or 'UNIQUE constraint failed' in message  # SQLite
+    )
+    return bool(duplicate) and 'sku' in message
+
 
 class InventoryEventsService:
     """Service for handling inventory-related events from other services"""
@@ -38,27 +58,29 @@ class InventoryEventsService:
                 extra={"correlationId": correlation_id}
             )
             
-            # Check if inventory already exists
-            existing_inventory = InventoryItem.query.filter_by(product_id=product_id).first()
-            if existing_inventory:
+            # Create new inventory record with zero initial stock. Inventory items are keyed
+            # by SKU, which other services know as the product ID; its unique constraint
+            # makes redelivered (or concurrently delivered) events a no-op
+            new_inventory = InventoryItem(
+                sku=product_id,
+                quantity_available=0,
+                quantity_reserved=0,
+                reorder_level=10
+            )
+            
+            try:
+                db.session.add(new_inventory)
+                db.session.commit()
+            except IntegrityError as e:
+                db.session.rollback()
+                if not _is_duplicate_sku(e):
+                    raise
                 current_app.logger.warning(
                     f"⚠️ InventoryItem already exists for product: {product_id}",
                     extra={"correlationId": correlation_id}
                 )
                 return {"status": "skipped", "message": "InventoryItem already exists"}
             
-            # Create new inventory record with zero initial stock
-            new_inventory = InventoryItem(
-                product_id=product_id,
-                quantity=0,
-                reserved_quantity=0,
-                warehouse="default",
-                low_stock_threshold=10
-            )
-            
-            db.session.add(new_inventory)
-            db.session.commit()
-            
             current_app.logger.info(
                 f"✅ Created inventory for product: {product_id}",
                 extra={"correlationId": correlation_id}
@@ -186,6 +208,14 @@ class InventoryEventsService:
     # Order Events
     # ============================================================================
     
+    @staticmethod
+    def _lock_inventories(skus) -> Dict[str, InventoryItem]:
+        """Fetch and row-lock the inventory records for skus in one query"""
+        if not skus:
+            return {}
+        inventories = InventoryItem.query.filter(InventoryItem.sku.in_(list(skus))).with_for_update().all()
+        return {inv.sku: inv for inv in inventories}
+    
     @staticmethod
     def handle_order_created(event_data: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -207,6 +237,16 @@ class InventoryEventsService:
             )
             
             reservations_created = []
+            reservation_rows = []
+            reserved_by_product: Dict[str, int] = {}
+            # One expiry timestamp for every reservation created from this order
+            expires_at = datetime.utcnow() + ORDER_RESERVATION_TTL
+            
+            # Lock every inventory row the order touches with a single query; the order's
+            # productId is the SKU inventory items are keyed by
+            inventory_by_product = InventoryEventsService._lock_inventories(
+                {item.get('productId') for item in items if item.get('productId')}
+            )
             
             for item in items:
                 product_id = item.get('productId')
@@ -219,11 +259,7 @@ class InventoryEventsService:
                     )
                     continue
                 
-                # Find inventory
-                inventory = InventoryItem.query.filter_by(
-                    product_id=product_id,
-                    is_active=True
-                ).with_for_update().first()
+                inventory = inventory_by_product.get(product_id)
                 
                 if not inventory:
                     current_app.logger.error(
@@ -236,8 +272,8 @@ class InventoryEventsService:
                         "message": f"InventoryItem not found for product {product_id}"
                     }
                 
-                # Check available stock
-                available = inventory.quantity - inventory.reserved_quantity
+                # Check available stock, counting earlier lines of this order for the same product
+                available = inventory.quantity_available - reserved_by_product.get(product_id, 0)
                 if available < quantity:
                     current_app.logger.error(
                         f"❌ Insufficient stock for product: {product_id} "
@@ -250,37 +286,54 @@ class InventoryEventsService:
                         "message": f"Insufficient stock for product {product_id}"
                     }
                 
-                # Create reservation
+                # Queue the reservation; rows are written in bulk once every item has been checked
                 reservation_id = str(uuid.uuid4())
-                reservation = Reservation(
-                    id=reservation_id,
-                    product_id=product_id,
-                    order_id=order_id,
-                    quantity=quantity,
-                    status='reserved',
-                    expires_at=datetime.utcnow() + timedelta(hours=24)
-                )
-                
-                inventory.reserved_quantity += quantity
-                
-                db.session.add(reservation)
+                reservation_rows.append({
+                    "id": reservation_id,
+                    "sku": product_id,
+                    "order_id": order_id,
+                    "quantity": quantity,
+                    "status": ReservationStatus.PENDING,
+                    "expires_at": expires_at
+                })
+                reserved_by_product[product_id] = reserved_by_product.get(product_id, 0) + quantity
                 reservations_created.append({
                     "reservationId": reservation_id,
                     "productId": product_id,
                     "quantity": quantity
                 })
-                
-                # Publish stock.reserved event
-                event_publisher.publish_stock_reserved(
-                    product_id=product_id,
-                    quantity=quantity,
-                    order_id=order_id,
-                    reservation_id=reservation_id,
-                    correlation_id=correlation_id
+            
+            if reservation_rows:
+                # Core table insert: write-only rows, no ORM bulk-insert bookkeeping
+                db.session.execute(Reservation.__table__.insert(), reservation_rows)
+                # Move the reserved units from available to reserved on every locked row at once
+                requested = case(reserved_by_product, value=InventoryItem.sku)
+                db.session.execute(
+                    update(InventoryItem)
+                    .where(InventoryItem.sku.in_(reserved_by_product))
+                    .values(
+                        quantity_available=InventoryItem.quantity_available - requested,
+                        quantity_reserved=InventoryItem.quantity_reserved + requested,
+                        updated_at=datetime.utcnow(),
+                        version=InventoryItem.version + 1
+                    )
+                    .execution_options(synchronize_session=False)
                 )
             
             db.session.commit()
             
+            # Publish stock.reserved events once the reservations are durable
+            event_publisher.publish_in_background([
+                (event_publisher.publish_stock_reserved, {
+                    "product_id": created["productId"],
+                    "quantity": created["quantity"],
+                    "order_id": order_id,
+                    "reservation_id": created["reservationId"],
+                    "correlation_id": correlation_id
+                })
+                for created in reservations_created
+            ])
+            
             current_app.logger.info(
                 f"✅ Reserved stock for order: {order_id} ({len(reservations_created)} items)",
                 extra={"correlationId": correlation_id}
@@ -323,7 +376,7 @@ class InventoryEventsService:
             # Find all reservations for this order
             reservations = Reservation.query.filter_by(
                 order_id=order_id,
-                status='reserved'
+                status=ReservationStatus.PENDING
             ).all()
             
             if not reservations:
@@ -334,28 +387,33 @@ class InventoryEventsService:
                 return {"status": "not_found", "message": "No reservations found"}
             
             released_count = 0
+            pending_events = []
+            
+            inventory_by_product = InventoryEventsService._lock_inventories(
+                {reservation.sku for reservation in reservations}
+            )
             
             for reservation in reservations:
-                inventory = InventoryItem.query.filter_by(
-                    product_id=reservation.product_id
-                ).with_for_update().first()
+                inventory = inventory_by_product.get(reservation.sku)
                 
                 if inventory:
-                    inventory.reserved_quantity = max(0, inventory.reserved_quantity - reservation.quantity)
-                    reservation.status = 'released'
-                    reservation.released_at = datetime.utcnow()
+                    # Return the reserved units to available stock
+                    inventory.quantity_available += reservation.quantity
+                    inventory.quantity_reserved = max(0, inventory.quantity_reserved - reservation.quantity)
+                    reservation.status = ReservationStatus.RELEASED
                     
-                    event_publisher.publish_stock_released(
-                        product_id=reservation.product_id,
-                        quantity=reservation.quantity,
-                        order_id=order_id,
-                        reason=reason,
-                        correlation_id=correlation_id
-                    )
+                    pending_events.append((event_publisher.publish_stock_released, {
+                        "product_id": reservation.sku,
+                        "quantity": reservation.quantity,
+                        "order_id": order_id,
+                        "reason": reason,
+                        "correlation_id": correlation_id
+                    }))
                     
                     released_count += 1
             
             db.session.commit()
+            event_publisher.publish_in_background(pending_events)
             
             current_app.logger.info(
                 f"✅ Released stock for cancelled order: {order_id} ({released_count} items)",
@@ -397,7 +455,7 @@ class InventoryEventsService:
             
             reservations = Reservation.query.filter_by(
                 order_id=order_id,
-                status='reserved'
+                status=ReservationStatus.PENDING
             ).all()
             
             if not reservations:
@@ -408,43 +466,46 @@ class InventoryEventsService:
                 return {"status": "not_found", "message": "No reservations found"}
             
             completed_count = 0
+            pending_events = []
+            
+            inventory_by_product = InventoryEventsService._lock_inventories(
+                {reservation.sku for reservation in reservations}
+            )
             
             for reservation in reservations:
-                inventory = InventoryItem.query.filter_by(
-                    product_id=reservation.product_id
-                ).with_for_update().first()
+                inventory = inventory_by_product.get(reservation.sku)
                 
                 if inventory:
-                    inventory.quantity = max(0, inventory.quantity - reservation.quantity)
-                    inventory.reserved_quantity = max(0, inventory.reserved_quantity - reservation.quantity)
+                    # Reserved units already left available stock when the order was created
+                    inventory.quantity_reserved = max(0, inventory.quantity_reserved - reservation.quantity)
                     
-                    reservation.status = 'completed'
-                    reservation.completed_at = datetime.utcnow()
+                    reservation.status = ReservationStatus.CONFIRMED
                     
-                    event_publisher.publish_stock_updated(
-                        product_id=reservation.product_id,
-                        quantity=inventory.quantity,
-                        correlation_id=correlation_id
-                    )
+                    pending_events.append((event_publisher.publish_stock_updated, {
+                        "product_id": reservation.sku,
+                        "quantity": inventory.quantity_available,
+                        "correlation_id": correlation_id
+                    }))
                     
                     # Check for low stock
-                    if inventory.quantity <= inventory.low_stock_threshold:
-                        if inventory.quantity == 0:
-                            event_publisher.publish_out_of_stock_alert(
-                                product_id=reservation.product_id,
-                                correlation_id=correlation_id
-                            )
+                    if inventory.quantity_available <= inventory.reorder_level:
+                        if inventory.quantity_available == 0:
+                            pending_events.append((event_publisher.publish_out_of_stock_alert, {
+                                "product_id": reservation.sku,
+                                "correlation_id": correlation_id
+                            }))
                         else:
-                            event_publisher.publish_low_stock_alert(
-                                product_id=reservation.product_id,
-                                current_quantity=inventory.quantity,
-                                threshold=inventory.low_stock_threshold,
-                                correlation_id=correlation_id
-                            )
+                            pending_events.append((event_publisher.publish_low_stock_alert, {
+                                "product_id": reservation.sku,
+                                "current_quantity": inventory.quantity_available,
+                                "threshold": inventory.reorder_level,
+                                "correlation_id": correlation_id
+                            }))
                     
                     completed_count += 1
             
             db.session.commit()
+            event_publisher.publish_in_background(pending_events)
             
             current_app.logger.info(
                 f"✅ Completed stock deduction for order: {order_id} ({completed_count} items)",
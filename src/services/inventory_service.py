@@ -19,6 +19,8 @@ class InventoryService:
     def __init__(self):
         self.inventory_repo = InventoryRepository()
         self.reservation_repo = ReservationRepository()
+        # Product enrichment is skipped until a product service client is wired in
+        self.product_client = None
     
     def check_stock_availability(self, stock_items: List[Dict[str, Any]]) -> Dict[str, Any]:
         """
@@ -72,8 +74,8 @@ class InventoryService:
             
             return response
             
-        except Exception as e:
-            logger.error(f"Error checking stock availability: {str(e)}")
+        except Exception:
+            logger.exception("Error checking stock availability")
             raise
     
     def get_inventory_by_sku(self, sku: str) -> Optional[Dict[str, Any]]:
@@ -86,41 +88,23 @@ class InventoryService:
             result = inventory_item.to_dict()
             
             # Enrich with product details if available
-            try:
-                product_details = self.product_client.get_product_by_id(inventory_item.product_id)
-                if product_details:
-                    result['product'] = product_details
-            except Exception as e:
-                logger.warning(f"Failed to fetch product details for {inventory_item.product_id}: {e}")
+            if self.product_client:
+                try:
+                    product_details = self.product_client.get_product_by_id(inventory_item.sku)
+                    if product_details:
+                        result['product'] = product_details
+                except Exception as e:
+                    logger.warning(f"Failed to fetch product details for {inventory_item.sku}: {e}")
             
             return result
             
-        except Exception as e:
-            logger.error(f"Error getting inventory for SKU {sku}: {str(e)}")
+        except Exception:
+            logger.exception("Error getting inventory for SKU %s", sku)
             raise
     
-
-        """Get inventory item by product ID"""
-        try:
-            inventory_item = self.inventory_repo.get_by_product_id(product_id)
-            if not inventory_item:
-                return None
-            
-            result = inventory_item.to_dict()
-            
-            # Enrich with product details if available
-            try:
-                product_details = self.product_client.get_product_by_id(inventory_item.product_id)
-                if product_details:
-                    result['product'] = product_details
-            except Exception as e:
-                logger.warning(f"Failed to fetch product details for {inventory_item.product_id}: {e}")
-            
-            return result
-            
-        except Exception as e:
-            logger.error(f"Error getting inventory for product ID {product_id}: {str(e)}")
-            raise
+    def get_inventory_by_product_id(self, product_id: str) -> Optional[Dict[str, Any]]:
+        """Get inventory item by product ID (items are keyed by SKU, which the API exposes as the product ID)"""
+        return self.get_inventory_by_sku(product_id)
     
     def create_inventory_item(self, **kwargs) -> Dict[str, Any]:
         """Create a new inventory item"""
@@ -138,13 +122,10 @@ class InventoryService:
             # Save to database
             created_item = self.inventory_repo.create(inventory_item)
             
-            # Clear relevant caches
-            self._clear_stock_caches()
-            
             return created_item.to_dict()
             
-        except Exception as e:
-            logger.error(f"Error creating inventory item: {str(e)}")
+        except Exception:
+            logger.exception("Error creating inventory item")
             raise
     
     def delete_inventory_item(self, sku: str) -> bool:
@@ -158,22 +139,18 @@ class InventoryService:
             # Delete the item
             success = self.inventory_repo.delete(inventory_item.sku)
             
-            if success:
-                # Clear relevant caches
-                self._clear_stock_caches()
-            
             return success
             
-        except Exception as e:
-            logger.error(f"Error deleting inventory item for product {product_id}: {str(e)}")
+        except Exception:
+            logger.exception("Error deleting inventory item for SKU %s", sku)
             raise
     
     def update_inventory_item(self, sku: str, **kwargs) -> Dict[str, Any]:
         """Update an inventory item"""
         try:
-            inventory_item = self.inventory_repo.get_by_product_id(product_id)
+            inventory_item = self.inventory_repo.get_by_sku(sku)
             if not inventory_item:
-                raise ValueError(f"Inventory item for product {product_id} not found")
+                raise ValueError(f"Inventory item for SKU {sku} not found")
             
             # Update allowed fields
             for key, value in kwargs.items():
@@ -183,12 +160,10 @@ class InventoryService:
             inventory_item.updated_at = datetime.utcnow()
             updated_item = self.inventory_repo.update(inventory_item)
             
-            self._clear_stock_caches()
-            
             return updated_item.to_dict()
             
-        except Exception as e:
-            logger.error(f"Error updating inventory item for product {product_id}: {str(e)}")
+        except Exception:
+            logger.exception("Error updating inventory item for SKU %s", sku)
             raise
 
     def adjust_stock(self, sku: str, quantity: int, movement_type, reference: str = None, reason: str = None) -> Dict[str, Any]:
@@ -218,24 +193,22 @@ class InventoryService:
                     reference=reference,
                     reason=reason
                 )
-                self._clear_stock_caches()
                 return movement.to_dict()
             else:
                 raise ValueError(f"Failed to adjust stock for SKU {sku}")
                 
-        except Exception as e:
-            logger.error(f"Error adjusting stock for SKU {sku}: {str(e)}")
+        except Exception:
+            logger.exception("Error adjusting stock for SKU %s", sku)
             raise
 
     def bulk_update_inventory(self, operations: List[dict]) -> List[dict]:
         """Bulk update inventory items"""
         try:
             results = self.inventory_repo.bulk_update(operations)
-            self._clear_stock_caches()
             return results
             
-        except Exception as e:
-            logger.error(f"Error bulk updating inventory: {str(e)}")
+        except Exception:
+            logger.exception("Error bulk updating inventory")
             raise
 
     def search_inventory(self, **kwargs) -> tuple[List[Dict[str, Any]], int]:
@@ -244,8 +217,8 @@ class InventoryService:
             items, total = self.inventory_repo.search(**kwargs)
             return [item.to_dict() for item in items], total
             
-        except Exception as e:
-            logger.error(f"Error searching inventory: {str(e)}")
+        except Exception:
+            logger.exception("Error searching inventory")
             raise
 
     def check_availability(self, sku: str, quantity: int) -> Dict[str, Any]:
@@ -268,8 +241,8 @@ class InventoryService:
                 'sku': sku
             }
             
-        except Exception as e:
-            logger.error(f"Error checking availability for SKU {sku}: {str(e)}")
+        except Exception:
+            logger.exception("Error checking availability for SKU %s", sku)
             raise
 
     def get_low_stock_items(self) -> List[Dict[str, Any]]:
@@ -278,8 +251,8 @@ class InventoryService:
             items = self.inventory_repo.get_low_stock_items()
             return [item.to_dict() for item in items]
             
-        except Exception as e:
-            logger.error(f"Error getting low stock items: {str(e)}")
+        except Exception:
+            logger.exception("Error getting low stock items")
             raise
 
     def health_check(self) -> Dict[str, Any]:
@@ -304,34 +277,13 @@ class InventoryService:
             }
             
         except Exception as e:
-            logger.error(f"Health check failed: {str(e)}")
+            logger.exception("Health check failed")
             return {
                 'status': 'unhealthy',
                 'error': str(e),
                 'timestamp': datetime.utcnow().isoformat()
             }
     
-    def _clear_stock_caches(self):
-        """Clear stock-related caches"""
-        if not self.redis:
-            return
-            
-        try:
-            # Clear stock check caches
-            keys = self.redis.keys("stock_check:*")
-            if keys:
-                self.redis.delete(*keys)
-            
-            # Clear inventory caches
-            keys = self.redis.keys("inventory:*")
-            if keys:
-                self.redis.delete(*keys)
-                
-            logger.debug("Cleared stock caches")
-            
-        except Exception as e:
-            logger.warning(f"Error clearing caches: {e}")
-
     def search_inventory_advanced(self, **kwargs) -> tuple[List[Dict[str, Any]], int]:
         """
         Advanced inventory search with extended filters and product details
@@ -354,8 +306,8 @@ class InventoryService:
                     
             return items, total_count
             
-        except Exception as e:
-            logger.error(f"Advanced inventory search failed: {e}")
+        except Exception:
+            logger.exception("Advanced inventory search failed")
             return [], 0
 
     def get_inventory_with_product_details(self, product_id: str) -> Optional[Dict[str, Any]]:
@@ -383,8 +335,8 @@ class InventoryService:
                     
             return inventory_item
             
-        except Exception as e:
-            logger.error(f"Get inventory with product details failed: {e}")
+        except Exception:
+            logger.exception("Get inventory with product details failed")
             return None
 
     # =========================================================================
@@ -394,15 +346,6 @@ class InventoryService:
     def create_reservation(self, sku: str, order_id: str, quantity: int, customer_id: str = None, ttl_minutes: int = 30) -> Dict[str, Any]:
         """Create a new reservation"""
         try:
-            # Check availability first
-            inventory_item = self.inventory_repo.get_by_sku(sku)
-            if not inventory_item:
-                raise ValueError(f"Product with SKU {sku} not found")
-            
-            if inventory_item.quantity_available < quantity:
-                raise ValueError("Insufficient stock")
-            
-            # Create reservation
             expires_at = datetime.utcnow() + timedelta(minutes=ttl_minutes)
             reservation = Reservation(
                 id=str(uuid4()),
@@ -413,22 +356,19 @@ class InventoryService:
                 expires_at=expires_at
             )
             
-            created_reservation = self.reservation_repo.create(reservation)
-            
-            # Update stock
-            self.inventory_repo.update_stock(
-                sku=sku,
-                quantity_change=quantity,
-                movement_type=StockMovementType.RESERVED,
+            # Reserve stock and save the reservation atomically; the conditional UPDATE
+            # rejects unknown SKUs and insufficient stock without a separate availability read
+            self.inventory_repo.reserve_stock_bulk(
+                [reservation],
                 reference=order_id,
                 reason=f"Reserved for order {order_id}"
             )
             
-            logger.info(f"Created reservation {created_reservation.id} for order {order_id}")
-            return created_reservation.to_dict()
+            logger.info(f"Created reservation {reservation.id} for order {order_id}")
+            return reservation.to_dict()
             
-        except Exception as e:
-            logger.error(f"Error creating reservation: {str(e)}")
+        except Exception:
+            logger.exception("Error creating reservation")
             raise
     
     def get_reservation(self, reservation_id: str) -> Optional[Dict[str, Any]]:
@@ -436,8 +376,8 @@ class InventoryService:
         try:
             reservation = self.reservation_repo.get_by_id(reservation_id)
             return reservation.to_dict() if reservation else None
-        except Exception as e:
-            logger.error(f"Error getting reservation {reservation_id}: {str(e)}")
+        except Exception:
+            logger.exception("Error getting reservation %s", reservation_id)
             raise
     
     def confirm_reservation(self, reservation_id: str, order_id: str) -> bool:
@@ -453,26 +393,30 @@ class InventoryService:
             if reservation.status != ReservationStatus.PENDING:
                 raise ValueError("Reservation is not pending")
             
-            if reservation.is_expired:
-                raise ValueError("Reservation has expired")
-            
-            # Update status
-            self.reservation_repo.update_status(reservation_id, ReservationStatus.CONFIRMED)
-            
-            # Convert reserved stock to sold
-            self.inventory_repo.update_stock(
-                sku=reservation.sku,
-                quantity_change=reservation.quantity,
-                movement_type=StockMovementType.OUT,
-                reference=order_id,
-                reason=f"Sold for order {order_id}"
-            )
+            # Update status and convert reserved stock to sold in one transaction. The
+            # UPDATE itself requires the reservation to be pending and unexpired, so
+            # expiry is only looked at again when it matches nothing.
+            try:
+                self.inventory_repo.transition_reservations(
+                    [reservation],
+                    ReservationStatus.CONFIRMED,
+                    StockMovementType.OUT,
+                    reason="Sold for order {order_id}",
+                    unexpired_only=True
+                )
+            except ValueError:
+                # The rollback expired the instance, so these reads reload the current row
+                if reservation.status != ReservationStatus.PENDING:
+                    raise ValueError("Reservation is not pending")
+                if reservation.is_expired:
+                    raise ValueError("Reservation has expired")
+                raise
             
             logger.info(f"Confirmed reservation {reservation_id} for order {order_id}")
             return True
             
-        except Exception as e:
-            logger.error(f"Error confirming reservation {reservation_id}: {str(e)}")
+        except Exception:
+            logger.exception("Error confirming reservation %s", reservation_id)
             raise
     
     def cancel_reservation(self, reservation_id: str) -> bool:
@@ -482,26 +426,22 @@ class InventoryService:
             if not reservation:
                 return False
             
-            # Cancel reservation
-            updated_reservation = self.reservation_repo.cancel(reservation_id)
-            if not updated_reservation:
-                return False
-            
-            # Release stock if it was pending
             if reservation.status == ReservationStatus.PENDING:
-                self.inventory_repo.update_stock(
-                    sku=reservation.sku,
-                    quantity_change=reservation.quantity,
-                    movement_type=StockMovementType.RELEASED,
-                    reference=reservation.order_id,
-                    reason=f"Released cancelled reservation for order {reservation.order_id}"
+                # Cancel reservation and release its stock in one transaction
+                self.inventory_repo.transition_reservations(
+                    [reservation],
+                    ReservationStatus.CANCELLED,
+                    StockMovementType.RELEASED,
+                    reason="Released cancelled reservation for order {order_id}"
                 )
+            else:
+                self.reservation_repo.cancel(reservation_id)
             
             logger.info(f"Cancelled reservation {reservation_id}")
             return True
             
-        except Exception as e:
-            logger.error(f"Error cancelling reservation {reservation_id}: {str(e)}")
+        except Exception:
+            logger.exception("Error cancelling reservation %s", reservation_id)
             raise
     
     def search_reservations(self, **kwargs):
@@ -511,8 +451,8 @@ class InventoryService:
             # Return just the list for test compatibility
             return [r.to_dict() for r in reservations]
             
-        except Exception as e:
-            logger.error(f"Error searching reservations: {str(e)}")
+        except Exception:
+            logger.exception("Error searching reservations")
             raise
 
     def search_reservations_with_count(self, **kwargs) -> tuple[List[Dict[str, Any]], int]:
@@ -521,76 +461,83 @@ class InventoryService:
             reservations, total = self.reservation_repo.search(**kwargs)
             return [r.to_dict() for r in reservations], total
             
-        except Exception as e:
-            logger.error(f"Error searching reservations: {str(e)}")
+        except Exception:
+            logger.exception("Error searching reservations")
             raise
     
     def confirm_reservations(self, reservation_ids: List[str], order_id: str) -> List[dict]:
         """Bulk confirm reservations"""
-        try:
-            results = []
-            for res_id in reservation_ids:
-                try:
-                    success = self.confirm_reservation(res_id, order_id)
-                    results.append({'reservation_id': res_id, 'success': success})
-                except Exception as e:
-                    results.append({'reservation_id': res_id, 'success': False, 'error': str(e)})
-            
-            return results
-            
-        except Exception as e:
-            logger.error(f"Error bulk confirming reservations: {str(e)}")
-            raise
+        return self.confirm_reservations_bulk(reservation_ids, order_id)
     
-    def process_expired_reservations(self) -> Dict[str, Any]:
-        """Process expired reservations"""
+    def process_expired_reservations(self, batch_size: int = 500,
+                                     max_batches: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Process expired reservations in batches. Each batch is claimed with
+        SKIP LOCKED so several workers can run concurrently without contending
+        for (or double-releasing) the same rows. ``max_batches`` bounds the work
+        per run; the remaining backlog is left for the next scheduled run.
+        A batch that fails (e.g. a deadlock) is rolled back and ends the run, since
+        retrying at once would claim the same rows; committed batches still count.
+        """
         try:
-            expired_reservations = self.reservation_repo.get_expired_reservations()
             processed_count = 0
+            failed_batches = 0
+            batches = 0
             
-            for reservation in expired_reservations:
+            while max_batches is None or batches < max_batches:
+                expired_reservations = self.reservation_repo.get_expired_reservations(
+                    batch_size=batch_size, skip_locked=True
+                )
+                if not expired_reservations:
+                    break
+                
+                # Expire the batch and release its stock in one transaction (releases the row locks)
                 try:
-                    # Update status to expired
-                    self.reservation_repo.update_status(reservation.id, ReservationStatus.EXPIRED)
-                    
-                    # Release stock
-                    self.inventory_repo.update_stock(
-                        sku=reservation.sku,
-                        quantity_change=reservation.quantity,
-                        movement_type=StockMovementType.RELEASED,
-                        reference=reservation.order_id,
-                        reason=f"Released expired reservation for order {reservation.order_id}"
+                    self.inventory_repo.transition_reservations(
+                        expired_reservations,
+                        ReservationStatus.EXPIRED,
+                        StockMovementType.RELEASED,
+                        reason="Released expired reservation for order {order_id}"
                     )
-                    
-                    processed_count += 1
-                    logger.info(f"Processed expired reservation {reservation.id}")
-                    
-                except Exception as e:
-                    logger.error(f"Error processing expired reservation {reservation.id}: {e}")
+                except Exception:
+                    # transition_reservations has already rolled the batch back
+                    failed_batches += 1
+                    logger.exception("Failed to process a batch of %d expired reservations",
+                                     len(expired_reservations))
+                    break
+                
+                logger.info("Processed %d expired reservations", len(expired_reservations))
+                logger.debug("Processed expired reservations: %s", [r.id for r in expired_reservations])
+                
+                processed_count += len(expired_reservations)
+                batches += 1
+                if len(expired_reservations) < batch_size:
+                    break
             
             return {
                 'processed_count': processed_count,
+                'failed_batches': failed_batches,
                 'processed_at': datetime.utcnow().isoformat()
             }
             
-        except Exception as e:
-            logger.error(f"Error processing expired reservations: {str(e)}")
+        except Exception:
+            logger.exception("Error processing expired reservations")
             raise
 
-    def cleanup_old_reservations(self) -> int:
+    def cleanup_old_reservations(self, max_chunks: Optional[int] = None) -> int:
         """Cleanup old expired reservations (background task)"""
         try:
-            # Delete reservations expired more than 24 hours ago
+            # Delete reservations expired more than 24 hours ago, in bounded chunks
             cutoff_time = datetime.utcnow() - timedelta(hours=24)
-            count = self.reservation_repo.delete_expired(cutoff_time)
+            count = self.reservation_repo.delete_expired(cutoff_time, max_chunks=max_chunks)
             
             if count > 0:
                 logger.info(f"Cleaned up {count} old reservations")
             
             return count
             
-        except Exception as e:
-            logger.error(f"Error cleaning up old reservations: {str(e)}")
+        except Exception:
+            logger.exception("Error cleaning up old reservations")
             raise
 
     def reserve_stock_for_order(self, order_id: str, items: List[Dict[str, Any]], 
@@ -607,16 +554,19 @@ class InventoryService:
             Dict with reservation details
         """
         try:
-            # Create reservations
-            reservations = []
             expires_at = datetime.utcnow() + timedelta(minutes=ttl_minutes)
             
+            # Total requested quantity per SKU (an order may repeat a SKU)
+            quantities = {}
             for item in items:
-                sku = item['sku']
-                quantity = item['quantity']
-                
-                # Check availability first
-                inventory_item = self.inventory_repo.get_by_sku(sku)
+                quantities[item['sku']] = quantities.get(item['sku'], 0) + item['quantity']
+            
+            # Check availability for all SKUs with a single query
+            inventory_items = self.inventory_repo.get_multiple_by_skus(list(quantities))
+            inventory_map = {item.sku: item for item in inventory_items}
+            
+            for sku, quantity in quantities.items():
+                inventory_item = inventory_map.get(sku)
                 if not inventory_item or inventory_item.quantity_available < quantity:
                     return {
                         'success': False,
@@ -625,37 +575,28 @@ class InventoryService:
                         'requested': quantity,
                         'available': inventory_item.quantity_available if inventory_item else 0
                     }
-                
-                # Create reservation record
-                reservation = Reservation(
+            
+            # Create reservation records
+            reservations = [
+                Reservation(
                     id=str(uuid4()),
                     order_id=order_id,
-                    sku=sku,
-                    quantity=quantity,
+                    sku=item['sku'],
+                    quantity=item['quantity'],
                     status=ReservationStatus.PENDING,
                     expires_at=expires_at
                 )
-                
-                # Save reservation
-                reservation = self.reservation_repo.create(reservation)
-                
-                # Update inventory (reserve stock)
-                success = self.inventory_repo.update_stock(
-                    sku=sku,
-                    quantity_change=quantity,
-                    movement_type=StockMovementType.RESERVED,
-                    reference=order_id,
-                    reason=f"Stock reserved for order {order_id}"
-                )
-                
-                if not success:
-                    # Rollback reservations if stock update fails
-                    logger.error(f"Failed to reserve stock for SKU {sku}")
-                    # TODO: Implement proper rollback mechanism
-                    raise Exception(f"Failed to reserve stock for SKU {sku}")
-                
-                reservations.append(reservation)
-                logger.info(f"Reserved {quantity} units of SKU {sku} for order {order_id}")
+                for item in items
+            ]
+            
+            # Save reservations and reserve stock atomically - any failure rolls back everything
+            self.inventory_repo.reserve_stock_bulk(
+                reservations,
+                reference=order_id,
+                reason=f"Stock reserved for order {order_id}"
+            )
+            
+            logger.info("Reserved stock for order %s: %s", order_id, quantities)
             
             return {
                 'success': True,
@@ -664,8 +605,8 @@ class InventoryService:
                 'message': f'Successfully reserved stock for {len(items)} items'
             }
             
-        except Exception as e:
-            logger.error(f"Error reserving stock for order {order_id}: {str(e)}")
+        except Exception:
+            logger.exception("Error reserving stock for order %s", order_id)
             raise
 
     def confirm_reservations_bulk(self, reservation_ids: List[str], order_id: str = None) -> List[dict]:
@@ -680,31 +621,59 @@ class InventoryService:
             List of confirmation results
         """
         try:
-            results = []
+            # Fetch reservations and their inventory rows with one query each
+            reservations = {r.id: r for r in self.reservation_repo.get_by_ids(reservation_ids)}
+            inventory_items = self.inventory_repo.get_multiple_by_skus(
+                list({r.sku for r in reservations.values()})
+            )
+            remaining = {item.sku: item.quantity_available for item in inventory_items}
+            now = datetime.utcnow()
             
+            # Validate every reservation in memory and partition into valid/invalid
+            results = []
+            valid = []
+            seen = set()
             for res_id in reservation_ids:
-                try:
-                    if order_id is None:
-                        # Use the reservation's own order_id
-                        reservation = self.reservation_repo.get_by_id(res_id)
-                        if reservation:
-                            success = self.confirm_reservation(res_id, reservation.order_id)
-                        else:
-                            success = False
-                    else:
-                        # Use provided order_id for all reservations
-                        success = self.confirm_reservation(res_id, order_id)
-                    
-                    results.append({'reservation_id': res_id, 'success': success})
-                    
-                except Exception as e:
-                    results.append({'reservation_id': res_id, 'success': False, 'error': str(e)})
-                    logger.error(f"Error confirming reservation {res_id}: {str(e)}")
+                reservation = reservations.get(res_id)
+                if not reservation:
+                    error = "Reservation not found"
+                elif order_id is not None and reservation.order_id != order_id:
+                    error = "Order ID mismatch"
+                elif reservation.status != ReservationStatus.PENDING or res_id in seen:
+                    error = "Reservation is not pending"
+                elif now > reservation.expires_at:
+                    error = "Reservation has expired"
+                elif remaining.get(reservation.sku, 0) < reservation.quantity:
+                    error = f"Insufficient stock for SKU {reservation.sku}"
+                else:
+                    error = None
+                
+                if error:
+                    results.append({'reservation_id': res_id, 'success': False, 'error': error})
+                    logger.error(f"Error confirming reservation {res_id}: {error}")
+                    continue
+                
+                seen.add(res_id)
+                remaining[reservation.sku] -= reservation.quantity
+                valid.append(reservation)
+                results.append({'reservation_id': res_id, 'success': True})
+            
+            if valid:
+                # Confirm all valid reservations and convert their stock to sold in one transaction
+                self.inventory_repo.transition_reservations(
+                    valid,
+                    ReservationStatus.CONFIRMED,
+                    StockMovementType.OUT,
+                    reason="Sold for order {order_id}",
+                    unexpired_only=True
+                )
+                
+                logger.info("Confirmed %d reservations: %s", len(valid), [r.id for r in valid])
             
             return results
             
         except Exception as e:
-            logger.error(f"Error in bulk confirm reservations: {str(e)}")
+            logger.exception("Error in bulk confirm reservations")
             # Return error result for all reservations
             return [{'reservation_id': res_id, 'success': False, 'error': str(e)} for res_id in reservation_ids]
 
@@ -723,35 +692,45 @@ class InventoryService:
                 # Process all expired reservations (for compatibility with tests)
                 return self.process_expired_reservations()
             
-            # Expire specific reservations
-            results = []
+            # Expire specific reservations with one lookup and set-based updates
+            reservations = {r.id: r for r in self.reservation_repo.get_by_ids(reservation_ids)}
+            pending = [r for r in reservations.values() if r.status == ReservationStatus.PENDING]
+            others = [r.id for r in reservations.values() if r.status != ReservationStatus.PENDING]
+            errors = {}
             
-            for res_id in reservation_ids:
+            if pending:
+                # Expire pending reservations and release their stock in one transaction
                 try:
-                    reservation = self.reservation_repo.get_by_id(res_id)
-                    if not reservation:
-                        results.append({'reservation_id': res_id, 'success': False, 'error': 'Not found'})
-                        continue
-                    
-                    # Update status to expired
-                    self.reservation_repo.update_status(res_id, ReservationStatus.EXPIRED)
-                    
-                    # Release stock if it was reserved
-                    if reservation.status == ReservationStatus.PENDING:
-                        self.inventory_repo.update_stock(
-                            sku=reservation.sku,
-                            quantity_change=reservation.quantity,
-                            movement_type=StockMovementType.RELEASED,
-                            reference=reservation.order_id,
-                            reason=f"Released manually expired reservation for order {reservation.order_id}"
-                        )
-                    
-                    results.append({'reservation_id': res_id, 'success': True})
-                    logger.info(f"Manually expired reservation {res_id}")
-                    
+                    self.inventory_repo.transition_reservations(
+                        pending,
+                        ReservationStatus.EXPIRED,
+                        StockMovementType.RELEASED,
+                        reason="Released manually expired reservation for order {order_id}"
+                    )
+                except Exception as e:
+                    errors.update((r.id, str(e)) for r in pending)
+                    logger.exception("Error expiring reservations %s", [r.id for r in pending])
+            
+            if others:
+                # Nothing is held for non-pending reservations, so only the status changes
+                try:
+                    self.reservation_repo.bulk_update_status(others, ReservationStatus.EXPIRED)
                 except Exception as e:
-                    results.append({'reservation_id': res_id, 'success': False, 'error': str(e)})
-                    logger.error(f"Error expiring reservation {res_id}: {e}")
+                    errors.update((res_id, str(e)) for res_id in others)
+                    logger.exception("Error expiring reservations %s", others)
+            
+            results = []
+            for res_id in reservation_ids:
+                if res_id not in reservations:
+                    results.append({'reservation_id': res_id, 'success': False, 'error': 'Not found'})
+                elif res_id in errors:
+                    results.append({'reservation_id': res_id, 'success': False, 'error': errors[res_id]})
+                else:
+                    results.append({'reservation_id': res_id, 'success': True})
+            
+            expired_ids = [r['reservation_id'] for r in results if r['success']]
+            if expired_ids:
+                logger.info("Manually expired %d reservations: %s", len(expired_ids), expired_ids)
             
             return {
                 'results': results,
@@ -761,7 +740,7 @@ class InventoryService:
                 'expired_at': datetime.utcnow().isoformat()
             }
             
-        except Exception as e:
-            logger.error(f"Error expiring reservations: {str(e)}")
+        except Exception:
+            logger.exception("Error expiring reservations")
             raise
 
@@ -50,9 +50,9 @@ def register_error_handlers(app):
     def internal_error(error):
         # Log with environment-specific stack trace handling
         if IS_DEVELOPMENT:
-            logger.error(f"Internal server error: {error}", exc_info=True)
+            logger.error("Internal server error: %s", error, exc_info=True)
         else:
-            logger.error(f"Internal server error: {error}")
+            logger.error("Internal server error: %s", error)
             
         return jsonify({
             'error': 'Internal Server Error',
@@ -62,7 +62,7 @@ def register_error_handlers(app):
     
     @app.errorhandler(ValidationError)
     def validation_error(error):
-        logger.warning(f"Validation error: {error.messages}")
+        logger.warning("Validation error: %s", error.messages)
         return jsonify({
             'error': 'Validation Error',
             'message': 'Request data validation failed',
@@ -72,7 +72,7 @@ def register_error_handlers(app):
     
     @app.errorhandler(ValueError)
     def value_error(error):
-        logger.warning(f"Value error: {str(error)}")
+        logger.warning("Value error: %s", error)
         return jsonify({
             'error': 'Invalid Value',
             'message': str(error),
@@ -84,11 +84,11 @@ def register_error_handlers(app):
         # Log with appropriate level based on status code
         if error.code >= 500:
             if IS_DEVELOPMENT:
-                logger.error(f"HTTP {error.code}: {error.description}", exc_info=True)
+                logger.error("HTTP %s: %s", error.code, error.description, exc_info=True)
             else:
-                logger.error(f"HTTP {error.code}: {error.description}")
+                logger.error("HTTP %s: %s", error.code, error.description)
         else:
-            logger.warning(f"HTTP {error.code}: {error.description}")
+            logger.warning("HTTP %s: %s", error.code, error.description)
             
         return jsonify({
             'error': error.name,
@@ -3,16 +3,25 @@ Dapr Event Publisher for Inventory Service
 Synchronous Flask-compatible event publishing using Dapr SDK
 """
 
-from dapr.clients import DaprClient
 from flask import current_app
 import json
-from typing import Dict, Any, Optional
-from datetime import datetime
+from typing import Dict, Any, Callable, List, Optional, Tuple, TYPE_CHECKING
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+import threading
 import uuid
 
 # Import trace context for W3C Trace Context support
 from src.middlewares.trace_context import get_trace_id
 
+if TYPE_CHECKING:
+    from dapr.clients import DaprClient
+
+
+def _utc_timestamp() -> str:
+    """Current UTC time as an ISO-8601 string with a Z suffix"""
+    return datetime.now(timezone.utc).isoformat(timespec='microseconds').replace('+00:00', 'Z')
+
 
 class InventoryEventPublisher:
     """
@@ -23,16 +32,79 @@ class InventoryEventPublisher:
     def __init__(self):
         self.pubsub_name = "inventory-pubsub"
         self.service_name = "inventory-service"
+        self._client: Optional['DaprClient'] = None
+        self._client_lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+    
+    def _get_client(self) -> 'DaprClient':
+        """
+        Return the shared Dapr client, creating it on first use.
+        The underlying gRPC channel is thread-safe, so one client serves every publish
+        instead of opening a new channel to the sidecar per event.
+        The Dapr SDK (and grpc with it) is imported here so app startup does not pay for it.
+        """
+        if self._client is None:
+            with self._client_lock:
+                if self._client is None:
+                    from dapr.clients import DaprClient
+                    self._client = DaprClient()
+        return self._client
+    
+    def _reset_client(self) -> None:
+        """Drop the shared client so the next publish reconnects to the sidecar"""
+        with self._client_lock:
+            client, self._client = self._client, None
+        if client is not None:
+            try:
+                client.close()
+            except Exception:
+                pass
+    
+    def _get_executor(self) -> ThreadPoolExecutor:
+        """Return the background publishing pool, creating it on first use"""
+        if self._executor is None:
+            with self._client_lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix='event-publisher')
+        return self._executor
+    
+    def publish_in_background(self, events: List[Tuple[Callable[..., bool], Dict[str, Any]]]) -> None:
+        """
+        Publish events on a background thread so the caller does not wait for the sidecar.
+        
+        Args:
+            events: (publish method, keyword arguments) pairs, published in order.
+                Call this only after the corresponding database changes are committed.
+        """
+        if not events:
+            return
+        
+        # Trace context lives on the request's g, which the background thread cannot see
+        trace_id = get_trace_id()
+        for _, kwargs in events:
+            if kwargs.get('correlation_id') is None:
+                kwargs['correlation_id'] = trace_id
+        
+        app = current_app._get_current_object()
+        
+        def _drain():
+            with app.app_context():
+                for publish, kwargs in events:
+                    publish(**kwargs)
+        
+        self._get_executor().submit(_drain)
     
     def _build_event_payload(self, event_type: str, data: Dict[str, Any], 
                             correlation_id: Optional[str] = None) -> Dict[str, Any]:
         """Build CloudEvents-compliant event payload"""
+        # Reuse the data timestamp so the envelope and payload agree and the clock is read once
+        event_time = data.get("timestamp") or _utc_timestamp()
         return {
             "specversion": "1.0",
             "type": event_type,
             "source": self.service_name,
             "id": str(uuid.uuid4()),
-            "time": datetime.utcnow().isoformat() + "Z",
+            "time": event_time,
             "datacontenttype": "application/json",
             "data": data,
             "correlationid": correlation_id or str(uuid.uuid4())
@@ -59,13 +131,12 @@ class InventoryEventPublisher:
             event_payload = self._build_event_payload(event_type, data, correlation_id)
             
             # Synchronous Dapr client call - blocks for ~5-20ms
-            with DaprClient() as client:
-                client.publish_event(
-                    pubsub_name=self.pubsub_name,
-                    topic_name=event_type,
-                    data=json.dumps(event_payload),
-                    data_content_type="application/json"
-                )
+            self._get_client().publish_event(
+                pubsub_name=self.pubsub_name,
+                topic_name=event_type,
+                data=json.dumps(event_payload),
+                data_content_type="application/json"
+            )
             
             current_app.logger.info(
                 f"✅ Published event: {event_type}",
@@ -78,6 +149,7 @@ class InventoryEventPublisher:
             return True
             
         except Exception as e:
+            self._reset_client()
             current_app.logger.error(
                 f"❌ Failed to publish event: {event_type} - {str(e)}",
                 extra={
@@ -100,7 +172,7 @@ class InventoryEventPublisher:
             "productId": product_id,
             "quantity": quantity,
             "warehouse": warehouse,
-            "timestamp": datetime.utcnow().isoformat() + "Z"
+            "timestamp": _utc_timestamp()
         }
         return self.publish_event("inventory.stock.updated", data, correlation_id)
     
@@ -113,7 +185,7 @@ class InventoryEventPublisher:
             "quantity": quantity,
             "orderId": order_id,
             "reservationId": reservation_id,
-            "timestamp": datetime.utcnow().isoformat() + "Z"
+            "timestamp": _utc_timestamp()
         }
         return self.publish_event("inventory.stock.reserved", data, correlation_id)
     
@@ -126,7 +198,7 @@ class InventoryEventPublisher:
             "quantity": quantity,
             "orderId": order_id,
             "reason": reason,
-            "timestamp": datetime.utcnow().isoformat() + "Z"
+            "timestamp": _utc_timestamp()
         }
         return self.publish_event("inventory.stock.released", data, correlation_id)
     
@@ -138,7 +210,7 @@ class InventoryEventPublisher:
             "currentQuantity": current_quantity,
             "threshold": threshold,
             "severity": "warning",
-            "timestamp": datetime.utcnow().isoformat() + "Z"
+            "timestamp": _utc_timestamp()
         }
         return self.publish_event("inventory.low.stock", data, correlation_id)
     
@@ -148,7 +220,7 @@ class InventoryEventPublisher:
         data = {
             "productId": product_id,
             "severity": "critical",
-            "timestamp": datetime.utcnow().isoformat() + "Z"
+            "timestamp": _utc_timestamp()
         }
         return self.publish_event("inventory.out.of.stock", data, correlation_id)
     
@@ -158,7 +230,7 @@ class InventoryEventPublisher:
         data = {
             "productId": product_id,
             "initialQuantity": initial_quantity,
-            "timestamp": datetime.utcnow().isoformat() + "Z"
+            "timestamp": _utc_timestamp()
         }
         return self.publish_event("inventory.created", data, correlation_id)
 
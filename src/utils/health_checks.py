@@ -3,38 +3,185 @@ Health Check Utilities for inventory service
 Provides standardized health checks for database and external services
 """
 
+import json
 import time
 import os
+import sys
+from functools import lru_cache, wraps
 import psutil
-import requests
-from datetime import datetime
-from sqlalchemy import text
+from cachetools import TTLCache
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+from datetime import datetime, timezone
+from flask import current_app
+from sqlalchemy import create_engine, text
 from src.database import db
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Shared HTTP session so dependency probes reuse keep-alive connections
+# instead of opening a new TCP/TLS connection on every check. Built on first use:
+# requests is only needed by readiness, so liveness-only workers never import it.
+_http_session = None
+_http_session_lock = threading.Lock()
+
+
+def _get_http_session():
+    global _http_session
+    if _http_session is None:
+        with _http_session_lock:
+            if _http_session is None:
+                import requests
+                from requests.adapters import HTTPAdapter
+                from urllib3.util.retry import Retry
+                
+                session = requests.Session()
+                session.headers.update({
+                    'Accept': 'application/json',
+                    'User-Agent': 'inventory-service-health-check/1.0',
+                })
+                adapter = HTTPAdapter(
+                    pool_connections=8,
+                    pool_maxsize=32,
+                    # One quick retry on gateway errors so a single dropped keep-alive
+                    # connection or upstream blip does not flip readiness
+                    max_retries=Retry(total=1, backoff_factor=0.1, status_forcelist=[502, 503, 504],
+                                      raise_on_status=False)
+                )
+                session.mount('http://', adapter)
+                session.mount('https://', adapter)
+                _http_session = session
+    return _http_session
+
+
+_now_iso_cache = (None, None)
+
+
+def now_iso():
+    """UTC timestamp for probe payloads (second precision), formatted once per second"""
+    global _now_iso_cache
+    second = int(time.time())
+    cached_second, cached_value = _now_iso_cache
+    if cached_second != second:
+        cached_value = datetime.fromtimestamp(second, timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+        _now_iso_cache = (second, cached_value)
+    return cached_value
+
+
+# Probes arrive several times per second from kubelet and load balancers; serve each
+# dependency check's last result for a few seconds instead of re-running its I/O
+HEALTH_CACHE_TTL = float(os.environ.get('HEALTH_CACHE_TTL', '5'))
+# Upper bound for how long a probe waits on a check another probe is already running
+HEALTH_INFLIGHT_WAIT = 10.0
+# Bounded and expiring, so checks keyed by arguments cannot grow the cache without limit
+_health_cache = TTLCache(maxsize=64, ttl=HEALTH_CACHE_TTL)
+_inflight = {}
+_health_cache_lock = threading.Lock()
+
+
+def ttl_cached(check):
+    """
+    Cache a health check's result for HEALTH_CACHE_TTL seconds, keyed by its arguments.
+    Concurrent callers of an expired check share a single in-flight run.
+    """
+    @wraps(check)
+    def wrapper(*args, **kwargs):
+        key = (check.__name__,) + args + tuple(sorted(kwargs.items()))
+        
+        while True:
+            with _health_cache_lock:
+                result = _health_cache.get(key)
+                if result is not None:
+                    return result
+                event = _inflight.get(key)
+                if event is None:
+                    event = _inflight[key] = threading.Event()
+                    break
+            
+            # Another probe is already running this check - wait for it, then re-check the
+            # cache; if that run failed, the next pass makes this caller run the check itself
+            if not event.wait(timeout=HEALTH_INFLIGHT_WAIT):
+                return check(*args, **kwargs)
+        
+        try:
+            result = check(*args, **kwargs)
+            with _health_cache_lock:
+                _health_cache[key] = result
+            return result
+        finally:
+            with _health_cache_lock:
+                del _inflight[key]
+            event.set()
+    
+    return wrapper
+
+
+# Probes get their own tiny connection pool so that, when the main pool is exhausted
+# by real traffic, readiness does not queue behind it and report a false failure
+_health_engines = {}
+_health_engine_lock = threading.Lock()
+
+
+def _get_health_engine():
+    """Dedicated short-timeout engine for the database probe, built once per database URL"""
+    engine = db.engine
+    if engine.dialect.name == 'sqlite':
+        # Local/test databases: pool tuning does not apply, probe the app engine directly
+        return engine
+    
+    health_engine = _health_engines.get(engine.url)
+    if health_engine is None:
+        with _health_engine_lock:
+            health_engine = _health_engines.get(engine.url)
+            if health_engine is None:
+                health_engine = create_engine(
+                    engine.url,
+                    pool_size=1,
+                    max_overflow=1,
+                    pool_timeout=1,
+                    pool_pre_ping=True,
+                    pool_recycle=300,
+                    connect_args={'connect_timeout': 2},
+                )
+                _health_engines[engine.url] = health_engine
+    return health_engine
+
+
+@lru_cache(maxsize=4)
+def _safe_database_url(url):
+    """Password-redacted database URL for error payloads, rendered once per URL"""
+    return url.render_as_string(hide_password=True)
+
+
+# Server version is fixed for the life of the connection target, so it is read once
+_db_version = None
+
+
+@ttl_cached
 def check_database_health():
     """Check MySQL database connectivity and performance"""
+    global _db_version
     try:
         start_time = time.time()
         
-        # Test database connection with a simple query
-        db.session.execute(text('SELECT 1'))
-        db.session.commit()
-        
-        response_time = (time.time() - start_time) * 1000  # Convert to milliseconds
-        
-        # Get database info
-        result = db.session.execute(text('SELECT VERSION() as version'))
-        version = result.fetchone()[0]
+        # Use the probe's own pool; it does not need an ORM session or transaction
+        with _get_health_engine().connect() as conn:
+            if _db_version is None:
+                # First probe: the version query doubles as the connectivity test
+                _db_version = conn.execute(text('SELECT VERSION() as version')).scalar()
+            else:
+                # Test database connection with a simple query
+                conn.execute(text('SELECT 1'))
+            
+            response_time = (time.time() - start_time) * 1000  # Convert to milliseconds
         
         return {
             'status': 'healthy',
             'message': 'MySQL database connection is healthy',
             'response_time': round(response_time, 2),
             'details': {
-                'version': version,
+                'version': _db_version,
                 'pool_size': db.engine.pool.size(),
                 'checked_in': db.engine.pool.checkedin(),
                 'checked_out': db.engine.pool.checkedout(),
@@ -48,20 +195,29 @@ def check_database_health():
             'response_time': 0,
             'details': {
                 'error': str(e),
-                'database_url': db.engine.url.render_as_string(hide_password=True),
+                'database_url': _safe_database_url(db.engine.url),
             },
         }
 
 
-    def check_redis_health():
-        """Redis disabled - returning unavailable status"""
-        return {
-            'status': 'unavailable',
-            'message': 'Redis disabled',
-            'latency_ms': None
-        }
-def check_external_service_health(service_name, service_url, timeout=5):
-    """Check external service connectivity"""
+def check_redis_health():
+    """Redis disabled - returning unavailable status"""
+    return {
+        'status': 'unavailable',
+        'message': 'Redis disabled',
+        'latency_ms': None
+    }
+
+
+# Upper bound on how much of a dependency's /health response body is read
+MAX_HEALTH_BODY_BYTES = 64 * 1024
+
+
+@ttl_cached
+def check_external_service_health(service_name, service_url, timeout=5, verbose=False):
+    """Check external service connectivity (the response body is only included when verbose)"""
+    import requests
+    
     start_time = time.time()
     
     try:
@@ -72,32 +228,26 @@ def check_external_service_health(service_name, service_url, timeout=5):
                 'response_time': 0,
             }
         
-        response = requests.get(
-            f'{service_url}/health',
-            timeout=timeout,
-            headers={
-                'Accept': 'application/json',
-                'User-Agent': 'inventory-service-health-check/1.0',
-            }
-        )
+        with _get_http_session().get(f'{service_url}/health', timeout=timeout, stream=True) as response:
+            # Read a bounded prefix of the body so a misbehaving upstream (e.g. a large HTML
+            # error page) cannot make the probe buffer and parse an unbounded payload
+            body = response.raw.read(MAX_HEALTH_BODY_BYTES, decode_content=True)
         
         response_time = (time.time() - start_time) * 1000
         
         if response.status_code == 200:
-            try:
-                response_body = response.json()
-            except ValueError:
-                response_body = {}
+            details = {'status_code': response.status_code}
+            if verbose:
+                try:
+                    details['body'] = json.loads(body) if body else {}
+                except ValueError:
+                    details['body'] = {}
             
             return {
                 'status': 'healthy',
                 'message': f'{service_name} is healthy',
                 'response_time': round(response_time, 2),
-                'details': {
-                    'status_code': response.status_code,
-                    'headers': dict(response.headers),
-                    'body': response_body,
-                },
+                'details': details,
             }
         else:
             return {
@@ -128,39 +278,106 @@ def check_external_service_health(service_name, service_url, timeout=5):
         }
 
 
-def perform_readiness_check():
-    """Perform comprehensive readiness check"""
+@lru_cache(maxsize=1)
+def get_external_services():
+    """External dependencies probed by readiness, read from the environment once per process"""
+    return (
+        {'name': 'product-service', 'url': os.environ.get('PRODUCT_SERVICE_URL')},
+    )
+
+
+# Liveness fails once the process has this many threads (leak / runaway pool guard)
+LIVENESS_MAX_THREADS = int(os.environ.get('LIVENESS_MAX_THREADS', '1000'))
+
+# Values that are fixed for the life of the process, read once instead of per probe
+_BOOT_TIME = psutil.boot_time()
+_PYTHON_VERSION = f"{sys.version_info.major}.{sys.version_info.minor}.{sys.version_info.micro}"
+_PLATFORM = sys.platform
+_CPU_COUNT = psutil.cpu_count()
+_TOTAL_MEMORY = psutil.virtual_memory().total
+
+
+def _init_process_info():
+    """
+    (Re)bind the per-process handle and IDs; also runs in forked workers.
+    Priming cpu_percent lets later calls report usage since the previous call
+    without blocking to sample an interval.
+    """
+    global _process, _PID, _PPID
+    _process = psutil.Process()
+    _process.cpu_percent(None)
+    _PID = os.getpid()
+    _PPID = os.getppid()
+
+
+_init_process_info()
+os.register_at_fork(after_in_child=_init_process_info)
+
+# Long-lived pool for readiness fan-out, so probes don't create and tear down threads
+_health_pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix='health')
+
+
+def _run_with_app_context(app, check, *args, **kwargs):
+    """Run a health check in a worker thread with the application context pushed"""
+    with app.app_context():
+        return check(*args, **kwargs)
+
+
+def _check_result(name, future, timeout):
+    """Result of a submitted check, or a timeout status if it missed the readiness deadline"""
+    if future.done():
+        return future.result()
+    return {
+        'status': 'timeout',
+        'message': f'{name} health check did not finish within {timeout}s',
+        'response_time': round(timeout * 1000, 2),
+    }
+
+
+def perform_readiness_check(verbose=False, overall_timeout=4.0):
+    """
+    Perform comprehensive readiness check (verbose adds dependency response bodies).
+    The whole check answers within overall_timeout seconds so it stays inside the
+    prober's own timeout; checks still running by then are reported as 'timeout'.
+    """
     checks = {}
     overall_healthy = True
     check_start_time = time.time()
     
     try:
-        # Check database connectivity
+        external_services = get_external_services()
+        configured_services = [service for service in external_services if service['url']]
+        
+        # Dependency checks are independent and I/O-bound, so run them concurrently:
+        # the readiness latency is the slowest check rather than the sum of all of them
+        app = current_app._get_current_object()
         logger.debug('Performing database health check')
-        checks['database'] = check_database_health()
+        futures = {'database': _health_pool.submit(_run_with_app_context, app, check_database_health)}
+        for service in configured_services:
+            logger.debug(f'Performing {service["name"]} service health check')
+            futures[service['name']] = _health_pool.submit(
+                check_external_service_health,
+                service['name'],
+                service['url'],
+                timeout=min(3, overall_timeout),
+                verbose=verbose
+            )
+        wait(futures.values(), timeout=overall_timeout)
+        
+        # Check database connectivity
+        checks['database'] = _check_result('database', futures['database'], overall_timeout)
         if checks['database']['status'] != 'healthy':
             overall_healthy = False
         
         # Redis disabled
         logger.debug('Redis health check skipped (disabled)')
-        checks['redis'] = {
-            'status': 'unavailable',
-            'message': 'Redis disabled',
-            'latency_ms': None
-        }
+        checks['redis'] = check_redis_health()
         
         # Check external services
-        external_services = [
-            {'name': 'product-service', 'url': os.environ.get('PRODUCT_SERVICE_URL')},
-        ]
-        
         for service in external_services:
             if service['url']:
-                logger.debug(f'Performing {service["name"]} service health check')
-                checks[service['name']] = check_external_service_health(
-                    service['name'], 
-                    service['url'], 
-                    timeout=3
+                checks[service['name']] = _check_result(
+                    service['name'], futures[service['name']], overall_timeout
                 )
                 
                 # For readiness, external services should be healthy or skipped
@@ -177,7 +394,7 @@ def perform_readiness_check():
         
         return {
             'status': 'ready' if overall_healthy else 'not ready',
-            'timestamp': datetime.utcnow().isoformat() + 'Z',
+            'timestamp': now_iso(),
             'total_check_time': total_check_time,
             'checks': checks,
         }
@@ -187,7 +404,7 @@ def perform_readiness_check():
         
         return {
             'status': 'not ready',
-            'timestamp': datetime.utcnow().isoformat() + 'Z',
+            'timestamp': now_iso(),
             'total_check_time': round((time.time() - check_start_time) * 1000, 2),
             'error': str(e),
             'checks': checks,
@@ -198,38 +415,30 @@ def perform_liveness_check():
     """Perform liveness check (should be fast and not check external dependencies)"""
     try:
         # Get process information
-        process = psutil.Process()
+        process = _process
+        
+        # oneshot() serves these readings from a single pass over /proc/<pid>
+        with process.oneshot():
+            memory_info = process.memory_info()
+            memory_percent = process.memory_percent()
+            # CPU usage since the previous sample (non-blocking)
+            cpu_percent = process.cpu_percent(None)
         
         # Check memory usage - if memory usage is > 90% of available, consider unhealthy
-        memory_info = process.memory_info()
-        memory_percent = process.memory_percent()
         memory_healthy = memory_percent < 90.0
         
-        # Check CPU usage over a short period
-        cpu_percent = process.cpu_percent(interval=0.1)
         cpu_healthy = cpu_percent < 95.0  # Less than 95% CPU is healthy
         
-        # Check if we can create a simple thread (basic responsiveness check)
-        import threading
-        thread_healthy = True
-        try:
-            def dummy_task():
-                time.sleep(0.01)
-            
-            thread = threading.Thread(target=dummy_task)
-            thread.start()
-            thread.join(timeout=1.0)
-            if thread.is_alive():
-                thread_healthy = False
-        except Exception:
-            thread_healthy = False
+        # Flag runaway thread growth instead of spawning a thread on every probe
+        active_threads = threading.active_count()
+        thread_healthy = active_threads < LIVENESS_MAX_THREADS
         
         is_healthy = memory_healthy and cpu_healthy and thread_healthy
         
         return {
             'status': 'alive' if is_healthy else 'unhealthy',
-            'timestamp': datetime.utcnow().isoformat() + 'Z',
-            'uptime': round(time.time() - psutil.boot_time(), 2),
+            'timestamp': now_iso(),
+            'uptime': round(time.time() - _BOOT_TIME, 2),
             'checks': {
                 'memory': {
                     'healthy': memory_healthy,
@@ -245,12 +454,12 @@ def perform_liveness_check():
                 },
                 'threading': {
                     'healthy': thread_healthy,
-                    'active_count': threading.active_count(),
+                    'active_count': active_threads,
                 },
                 'process': {
-                    'pid': os.getpid(),
-                    'python_version': f"{psutil.sys.version_info.major}.{psutil.sys.version_info.minor}.{psutil.sys.version_info.micro}",
-                    'platform': psutil.sys.platform,
+                    'pid': _PID,
+                    'python_version': _PYTHON_VERSION,
+                    'platform': _PLATFORM,
                 },
             },
         }
@@ -260,7 +469,7 @@ def perform_liveness_check():
         
         return {
             'status': 'unhealthy',
-            'timestamp': datetime.utcnow().isoformat() + 'Z',
+            'timestamp': now_iso(),
             'error': str(e),
         }
 
@@ -268,30 +477,36 @@ def perform_liveness_check():
 def get_system_metrics():
     """Get system metrics for monitoring"""
     try:
-        process = psutil.Process()
-        memory_info = process.memory_info()
+        process = _process
+        # oneshot() serves these readings from a single pass over /proc/<pid>
+        with process.oneshot():
+            memory_info = process.memory_info()
+            memory_percent = process.memory_percent()
+            cpu_percent = process.cpu_percent(None)
+            cpu_times = process.cpu_times()
+            num_threads = process.num_threads()
         
         return {
-            'timestamp': datetime.utcnow().isoformat() + 'Z',
-            'uptime': round(time.time() - psutil.boot_time(), 2),
+            'timestamp': now_iso(),
+            'uptime': round(time.time() - _BOOT_TIME, 2),
             'memory': {
                 'rss': memory_info.rss,
                 'vms': memory_info.vms,
-                'percent': round(process.memory_percent(), 2),
+                'percent': round(memory_percent, 2),
                 'available': psutil.virtual_memory().available,
-                'total': psutil.virtual_memory().total,
+                'total': _TOTAL_MEMORY,
             },
             'cpu': {
-                'percent': round(process.cpu_percent(interval=0.1), 2),
-                'times': process.cpu_times()._asdict(),
-                'count': psutil.cpu_count(),
+                'percent': round(cpu_percent, 2),
+                'times': cpu_times._asdict(),
+                'count': _CPU_COUNT,
             },
             'process': {
-                'pid': os.getpid(),
-                'ppid': os.getppid(),
-                'python_version': f"{psutil.sys.version_info.major}.{psutil.sys.version_info.minor}.{psutil.sys.version_info.micro}",
-                'platform': psutil.sys.platform,
-                'threads': process.num_threads(),
+                'pid': _PID,
+                'ppid': _PPID,
+                'python_version': _PYTHON_VERSION,
+                'platform': _PLATFORM,
+                'threads': num_threads,
             },
             'disk': {
                 'usage': psutil.disk_usage('/')._asdict(),
@@ -305,6 +520,6 @@ def get_system_metrics():
     except Exception as e:
         logger.error('Metrics collection failed', extra={'error': str(e)})
         return {
-            'timestamp': datetime.utcnow().isoformat() + 'Z',
+            'timestamp': now_iso(),
             'error': str(e),
         }
@@ -1,5 +1,4 @@
 from marshmallow import Schema, fields, validate, post_load, ValidationError
-from datetime import datetime
 from src.models import StockMovementType
 
 
@@ -67,13 +66,33 @@ class ReservationResponseSchema(Schema):
     updated_at = fields.DateTime(dump_only=True)
 
 
+_MOVEMENT_TYPE_VALUES = tuple(mt.value for mt in StockMovementType)
+
+
+class _OneOfSet(validate.OneOf):
+    """OneOf with hashed membership checks; choices keep their order for error messages"""
+    
+    def __init__(self, choices, **kwargs):
+        super().__init__(choices, **kwargs)
+        self._choice_set = frozenset(self.choices)
+    
+    def __call__(self, value):
+        try:
+            if value not in self._choice_set:
+                raise ValidationError(self._format_error(value))
+        except TypeError as error:
+            raise ValidationError(self._format_error(value)) from error
+        
+        return value
+
+
 class StockAdjustmentRequestSchema(Schema):
     """Schema for stock adjustments"""
     product_id = fields.Str(required=True, validate=validate.Length(min=1))
     quantity = fields.Int(required=True)
     movement_type = fields.Str(
         required=True, 
-        validate=validate.OneOf([mt.value for mt in StockMovementType])
+        validate=_OneOfSet(_MOVEMENT_TYPE_VALUES)
     )
     reference_id = fields.Str(validate=validate.Length(min=1), allow_none=True)
     notes = fields.Str(validate=validate.Length(max=500), allow_none=True)
@@ -91,6 +110,9 @@ class StockMovementResponseSchema(Schema):
     created_at = fields.DateTime(dump_only=True)
 
 
+_BULK_OPERATION_REQUIRED_FIELDS = frozenset({'product_id', 'quantity'})
+
+
 class BulkOperationRequestSchema(Schema):
     """Schema for bulk operations"""
     operations = fields.List(fields.Dict(), required=True, validate=validate.Length(min=1))
@@ -101,13 +123,13 @@ class BulkOperationRequestSchema(Schema):
         if len(operations) > 100:
             raise ValidationError('Maximum 100 operations allowed per request')
         
-        required_fields = {'product_id', 'quantity'}
         for i, operation in enumerate(operations):
             if not isinstance(operation, dict):
                 raise ValidationError(f'Operation {i} must be a dictionary')
             
-            missing_fields = required_fields - set(operation.keys())
-            if missing_fields:
+            # Direct membership checks; the missing set is only built on the error path
+            if 'product_id' not in operation or 'quantity' not in operation:
+                missing_fields = _BULK_OPERATION_REQUIRED_FIELDS - operation.keys()
                 raise ValidationError(f'Operation {i} missing fields: {missing_fields}')
         
         return data
@@ -125,9 +147,9 @@ class InventorySearchSchema(Schema):
     
     @post_load
     def validate_search_params(self, data, **kwargs):
-        # Ensure at least one search criterion is provided
-        search_fields = ['product_ids', 'location', 'low_stock', 'out_of_stock', 'has_reservations']
-        if not any(data.get(field) for field in search_fields):
+        # Ensure at least one search criterion is provided (short-circuits on the first one set)
+        if not (data.get('product_ids') or data.get('low_stock') or data.get('out_of_stock')
+                or data.get('location') or data.get('has_reservations')):
             raise ValidationError('At least one search criterion must be provided')
         
         return data
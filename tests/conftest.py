@@ -0,0 +1,87 @@
+"""
+Shared pytest configuration: the test app, its SQLite engine setup and the
+transactional database fixtures used by both the unit and integration suites.
+"""
+
+import os
+from contextlib import contextmanager
+
+import pytest
+
+# Set test environment variables before importing the app
+os.environ['FLASK_ENV'] = 'testing'
+os.environ['DATABASE_URL'] = 'sqlite:///:memory:'
+os.environ['REDIS_URL'] = 'redis://localhost:6379/1'
+
+from sqlalchemy import event
+
+from src.database import db
+
+
+@pytest.fixture(scope='session')
+def app():
+    """Create application for the tests."""
+    # Imported here so collecting tests does not load every blueprint, service and client
+    from src import create_app
+    
+    app = create_app('testing')
+    
+    with app.app_context():
+        if db.engine.dialect.name == 'sqlite':
+            # Let SQLAlchemy emit BEGIN (pysqlite's own handling breaks SAVEPOINTs) and relax durability
+            @event.listens_for(db.engine, 'connect')
+            def _configure_sqlite(dbapi_connection, connection_record):
+                dbapi_connection.isolation_level = None
+                # Test data never needs to survive a crash; skip journal and fsync work on commit
+                cursor = dbapi_connection.cursor()
+                cursor.execute('PRAGMA journal_mode=MEMORY')
+                cursor.execute('PRAGMA synchronous=OFF')
+                cursor.execute('PRAGMA temp_store=MEMORY')
+                cursor.close()
+            
+            @event.listens_for(db.engine, 'begin')
+            def _emit_begin(connection):
+                connection.exec_driver_sql('BEGIN')
+        
+        # Create all database tables once for the whole run
+        db.create_all()
+        yield app
+        # Clean up
+        db.session.remove()
+        db.drop_all()
+
+
+@contextmanager
+def _transactional_session():
+    """
+    Run the enclosed code inside an outer transaction that is rolled back afterwards;
+    commits made by tests (or the code under test) only release SAVEPOINTs.
+    """
+    connection = db.engine.connect()
+    transaction = connection.begin()
+    try:
+        with pytest.MonkeyPatch.context() as mp:
+            # Route the default bind through the test connection and join its transaction
+            mp.setitem(db.engines, None, connection)
+            mp.setattr(db, 'session', db._make_scoped_session({'join_transaction_mode': 'create_savepoint'}))
+            try:
+                yield db.session
+            finally:
+                db.session.remove()
+    finally:
+        transaction.rollback()
+        connection.close()
+
+
+@pytest.fixture
+def db_session(app):
+    """Database session for a single test; no rows outlive it."""
+    with _transactional_session() as session:
+        yield session
+
+
+@pytest.fixture(scope='class')
+def db_transaction(app):
+    """Database session shared by a test class, for read-only tests that share one dataset."""
+    with _transactional_session() as session:
+        yield session
@@ -5,36 +5,26 @@ Tests the stats endpoint with real database queries
 
 import pytest
 from flask import Flask
-from src.api.main import create_app
 from src.database import db
 from src.models import InventoryItem
 
-
-@pytest.fixture
-def app():
-    """Create test Flask app"""
-    app = create_app('test')
-    with app.app_context():
-        db.create_all()
-        yield app
-        db.session.remove()
-        db.drop_all()
+# The stats tests only read, so each test class shares one rolled-back dataset
+pytestmark = pytest.mark.usefixtures('db_transaction')
 
 
-@pytest.fixture
+@pytest.fixture(scope='session')
 def client(app):
     """Create test client"""
     return app.test_client()
 
 
-@pytest.fixture
-def sample_inventory_items(app):
-    """Create sample inventory items for testing"""
+@pytest.fixture(scope='class')
+def sample_inventory_items(app, db_transaction):
+    """Create sample inventory items once per test class"""
     with app.app_context():
         items = [
             # Products with stock
             InventoryItem(
-                product_id='PROD-001',
                 sku='SKU-001',
                 quantity_available=100,
                 quantity_reserved=10,
@@ -42,7 +32,6 @@ def sample_inventory_items(app):
                 cost_per_unit=10.0
             ),
             InventoryItem(
-                product_id='PROD-002',
                 sku='SKU-002',
                 quantity_available=50,
                 quantity_reserved=5,
@@ -51,7 +40,6 @@ def sample_inventory_items(app):
             ),
             # Low stock item
             InventoryItem(
-                product_id='PROD-003',
                 sku='SKU-003',
                 quantity_available=5,
                 quantity_reserved=0,
@@ -60,7 +48,6 @@ def sample_inventory_items(app):
             ),
             # Out of stock item
             InventoryItem(
-                product_id='PROD-004',
                 sku='SKU-004',
                 quantity_available=0,
                 quantity_reserved=0,
@@ -69,8 +56,7 @@ def sample_inventory_items(app):
             ),
         ]
         
-        for item in items:
-            db.session.add(item)
+        db.session.add_all(items)
         db.session.commit()
         
         return items
@@ -146,6 +132,17 @@ class TestStatsEndpoint:
         # Total value: (100*10) + (50*15) + (5*20) + (0*25) = 1000 + 750 + 100 + 0 = 1850
         assert data['totalInventoryValue'] == 1850.0
     
+    def test_stats_service_identifier(self, client, sample_inventory_items):
+        """Test that service identifier is present"""
+        response = client.get('/api/stats')
+        data = response.json
+        
+        assert data['service'] == 'inventory-service'
+
+
+class TestStatsEndpointEmpty:
+    """Stats for an empty inventory; kept apart from the class that loads sample data"""
+    
     def test_stats_empty_inventory(self, client):
         """Test stats with empty inventory"""
         response = client.get('/api/stats')
@@ -157,10 +154,3 @@ class TestStatsEndpoint:
         assert data['totalInventoryValue'] == 0.0
         assert data['totalUnits'] == 0
         assert data['totalItems'] == 0
-    
-    def test_stats_service_identifier(self, client, sample_inventory_items):
-        """Test that service identifier is present"""
-        response = client.get('/api/stats')
-        data = response.json
-        
-        assert data['service'] == 'inventory-service'
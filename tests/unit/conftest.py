@@ -1,35 +1,18 @@
-import os
 import pytest
 import tempfile
 from unittest.mock import patch, MagicMock
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 import json
+from types import MappingProxyType
 
-# Set test environment variables before importing the app
-os.environ['FLASK_ENV'] = 'testing'
-os.environ['DATABASE_URL'] = 'sqlite:///:memory:'
-os.environ['REDIS_URL'] = 'redis://localhost:6379/1'
+import time_machine
 
-from src.api.main import create_app
-from src.models import db, InventoryItem, Reservation, StockMovement, StockMovementType, ReservationStatus
+from src.models import InventoryItem, Reservation, StockMovement, StockMovementType, ReservationStatus
 
 
-@pytest.fixture(scope='session')
-def app():
-    """Create application for the tests."""
-    app = create_app('testing')
-    
-    with app.app_context():
-        # Create all database tables
-        db.create_all()
-        yield app
-        # Clean up
-        db.drop_all()
-
-
-@pytest.fixture
+@pytest.fixture(scope='class')
 def client(app):
-    """A test client for the app."""
+    """A test client for the app, shared by the tests of a class (the API is stateless)."""
     return app.test_client()
 
 
@@ -39,20 +22,28 @@ def runner(app):
     return app.test_cli_runner()
 
 
-@pytest.fixture
-def db_session(app):
-    """Create a database session for a test."""
-    with app.app_context():
-        # Create all tables
-        db.create_all()
-        
-        yield db.session
-        
-        # Clean up tables
-        db.session.rollback()
-        for table in reversed(db.metadata.sorted_tables):
-            db.session.execute(table.delete())
-        db.session.commit()
+@pytest.fixture(scope='class')
+def inventory_service():
+    """InventoryService shared by a test class; it holds no per-test state."""
+    from src.services import InventoryService
+    
+    return InventoryService()
+
+
+@pytest.fixture(scope='class')
+def inventory_repo():
+    """InventoryRepository shared by a test class."""
+    from src.repositories import InventoryRepository
+    
+    return InventoryRepository()
+
+
+@pytest.fixture(scope='class')
+def reservation_repo():
+    """ReservationRepository shared by a test class."""
+    from src.repositories import ReservationRepository
+    
+    return ReservationRepository()
 
 
 @pytest.fixture
@@ -60,29 +51,41 @@ def sample_inventory_item(db_session):
     """Create a sample inventory item for testing."""
     item = InventoryItem(
         sku='TEST-SKU-001',
-        product_id='TEST001',
         quantity_available=100,
         quantity_reserved=10,
         reorder_level=20,
         max_stock=200
     )
     db_session.add(item)
-    db_session.commit()
+    db_session.flush()
     return item
 
 
+FROZEN_NOW = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def now():
+    """
+    Freeze the clock for the test and return the frozen naive-UTC time, matching the
+    models' DateTime columns. Code under test calling datetime.utcnow() sees the same value.
+    """
+    with time_machine.travel(FROZEN_NOW, tick=False):
+        yield FROZEN_NOW.replace(tzinfo=None)
+
+
 @pytest.fixture
-def sample_reservation(db_session, sample_inventory_item):
+def sample_reservation(db_session, sample_inventory_item, now):
     """Create a sample reservation for testing."""
     reservation = Reservation(
         sku=sample_inventory_item.sku,
         order_id='ORDER001',
         quantity=5,
         status=ReservationStatus.PENDING,
-        expires_at=datetime.utcnow() + timedelta(hours=24)
+        expires_at=now + timedelta(hours=24)
     )
     db_session.add(reservation)
-    db_session.commit()
+    db_session.flush()
     return reservation
 
 
@@ -97,7 +100,7 @@ def sample_stock_movement(db_session, sample_inventory_item):
         reason='Test stock movement'
     )
     db_session.add(movement)
-    db_session.commit()
+    db_session.flush()
     return movement
 
 
@@ -108,27 +111,24 @@ def mock_dependencies(monkeypatch):
     mock_product_client = MagicMock()
 
 
+# Product payload returned by the mocked Product Service, built once at import
+TEST_PRODUCT = {
+    'id': 'TEST001',
+    'name': 'Test Product',
+    'category': 'Electronics',
+    'price': 99.99
+}
+
+
 @pytest.fixture
-def mock_product_service():
-    """Mock Product Service client for testing."""
-    with patch('src.shared.utils.external_service_client.ProductServiceClient') as mock_client:
-        mock_instance = MagicMock()
-        mock_instance.get_product.return_value = {
-            'id': 'TEST001',
-            'name': 'Test Product',
-            'category': 'Electronics',
-            'price': 99.99
-        }
-        mock_instance.get_products.return_value = [
-            {
-                'id': 'TEST001',
-                'name': 'Test Product',
-                'category': 'Electronics',
-                'price': 99.99
-            }
-        ]
-        mock_client.return_value = mock_instance
-        yield mock_instance
+def mock_product_service(inventory_service, monkeypatch):
+    """Mock the Product Service client used by InventoryService for product enrichment."""
+    # A fresh mock per test keeps call records isolated; only the payloads are shared
+    mock_client = MagicMock()
+    mock_client.get_product.return_value = dict(TEST_PRODUCT)
+    mock_client.get_product_by_id.return_value = dict(TEST_PRODUCT)
+    monkeypatch.setattr(inventory_service, 'product_client', mock_client)
+    return mock_client
 
 
 @pytest.fixture
@@ -145,8 +145,7 @@ def create_test_inventory_item(db_session, **kwargs):
     """Create a test inventory item with default values."""
     import uuid
     defaults = {
-        'sku': f'TEST-SKU-{str(uuid.uuid4())[:8]}',  # Generate unique SKU
-        'product_id': 'TEST001',
+        'sku': f'TEST-SKU-{uuid.uuid4().hex[:8]}',  # Generate unique SKU
         'quantity_available': 100,
         'quantity_reserved': 0,
         'reorder_level': 10,
@@ -156,24 +155,44 @@ def create_test_inventory_item(db_session, **kwargs):
     
     item = InventoryItem(**defaults)
     db_session.add(item)
-    db_session.commit()
+    db_session.flush()
     return item
 
 
+def bulk_create_inventory_items(db_session, specs):
+    """Insert several test inventory items with one executemany; returns their SKUs."""
+    import uuid
+    rows = []
+    for spec in specs:
+        row = {
+            'quantity_available': 100,
+            'quantity_reserved': 0,
+            'reorder_level': 10,
+            'max_stock': 200,
+            **spec
+        }
+        row.setdefault('sku', f'TEST-SKU-{uuid.uuid4().hex[:8]}')
+        rows.append(row)
+    
+    db_session.execute(InventoryItem.__table__.insert(), rows)
+    return [row['sku'] for row in rows]
+
+
 def create_test_reservation(db_session, inventory_item, **kwargs):
     """Create a test reservation with default values."""
     defaults = {
         'sku': inventory_item.sku,
         'order_id': 'ORDER001',
         'quantity': 5,
-        'status': ReservationStatus.PENDING,
-        'expires_at': datetime.utcnow() + timedelta(hours=24)
+        'status': ReservationStatus.PENDING
     }
     defaults.update(kwargs)
+    if 'expires_at' not in defaults:
+        defaults['expires_at'] = datetime.utcnow() + timedelta(hours=24)
     
     reservation = Reservation(**defaults)
     db_session.add(reservation)
-    db_session.commit()
+    db_session.flush()
     return reservation
 
 
@@ -191,75 +210,86 @@ def create_test_stock_movement(db_session, inventory_item, **kwargs):
     
     movement = StockMovement(**defaults)
     db_session.add(movement)
-    db_session.commit()
+    db_session.flush()
     return movement
 
 
+def add_all_and_flush(db_session, objects):
+    """Add several objects and flush them in one batch."""
+    db_session.add_all(objects)
+    db_session.flush()
+    return objects
+
+
 # Custom assertions
+_INVENTORY_RESPONSE_KEYS = (
+    'id', 'sku', 'quantity_available', 'quantity_reserved',
+    'total_quantity', 'reorder_level', 'max_stock'
+)
+_RESERVATION_RESPONSE_KEYS = ('id', 'sku', 'order_id', 'quantity')
+_STOCK_MOVEMENT_RESPONSE_KEYS = ('id', 'sku', 'quantity', 'reference')
+
+
+def _response_subset(response_data, keys):
+    """Pick keys from a response payload; a missing key fails with KeyError as before."""
+    return {key: response_data[key] for key in keys}
+
+
 def assert_inventory_response(response_data, expected_item):
     """Assert inventory item response format."""
-    assert response_data['id'] == expected_item.id
-    assert response_data['sku'] == expected_item.sku
-    assert response_data['product_id'] == expected_item.product_id
-    assert response_data['quantity_available'] == expected_item.quantity_available
-    assert response_data['quantity_reserved'] == expected_item.quantity_reserved
-    assert response_data['total_quantity'] == expected_item.total_quantity
-    assert response_data['reorder_level'] == expected_item.reorder_level
-    assert response_data['max_stock'] == expected_item.max_stock
+    expected = {key: getattr(expected_item, key) for key in _INVENTORY_RESPONSE_KEYS}
+    assert _response_subset(response_data, _INVENTORY_RESPONSE_KEYS) == expected
 
 
 def assert_reservation_response(response_data, expected_reservation):
     """Assert reservation response format."""
-    assert response_data['id'] == expected_reservation.id
-    assert response_data['sku'] == expected_reservation.sku
-    assert response_data['order_id'] == expected_reservation.order_id
-    assert response_data['quantity'] == expected_reservation.quantity
-    assert response_data['status'] == expected_reservation.status.value
+    expected = {key: getattr(expected_reservation, key) for key in _RESERVATION_RESPONSE_KEYS}
+    expected['status'] = expected_reservation.status.value
+    assert _response_subset(response_data, _RESERVATION_RESPONSE_KEYS + ('status',)) == expected
 
 
 def assert_stock_movement_response(response_data, expected_movement):
     """Assert stock movement response format."""
-    assert response_data['id'] == expected_movement.id
-    assert response_data['sku'] == expected_movement.sku
-    assert response_data['movement_type'] == expected_movement.movement_type.value
-    assert response_data['quantity'] == expected_movement.quantity
-    assert response_data['reference'] == expected_movement.reference
+    expected = {key: getattr(expected_movement, key) for key in _STOCK_MOVEMENT_RESPONSE_KEYS}
+    expected['movement_type'] = expected_movement.movement_type.value
+    assert _response_subset(response_data, _STOCK_MOVEMENT_RESPONSE_KEYS + ('movement_type',)) == expected
 
 
 # Test data generators
+_INVENTORY_DEFAULTS = MappingProxyType({
+    'sku': 'TEST-SKU-001',
+    'quantity_available': 100,
+    'quantity_reserved': 0,
+    'reorder_level': 10,
+    'max_stock': 200
+})
+
+_RESERVATION_DEFAULTS = MappingProxyType({
+    'sku': 'TEST-SKU-001',
+    'order_id': 'ORDER001',
+    'quantity': 5
+})
+
+_STOCK_ADJUSTMENT_DEFAULTS = MappingProxyType({
+    'quantity': 10,
+    'movement_type': StockMovementType.IN.value,
+    'reference': 'REF001',
+    'reason': 'Test adjustment'
+})
+
+
 def generate_inventory_data(**kwargs):
     """Generate inventory item test data."""
-    defaults = {
-        'sku': 'TEST-SKU-001',
-        'product_id': 'PROD001',
-        'quantity_available': 100,
-        'quantity_reserved': 0,
-        'reorder_level': 10,
-        'max_stock': 200
-    }
-    defaults.update(kwargs)
-    return defaults
+    return {**_INVENTORY_DEFAULTS, **kwargs}
 
 
 def generate_reservation_data(**kwargs):
     """Generate reservation test data."""
-    defaults = {
-        'sku': 'TEST-SKU-001',
-        'order_id': 'ORDER001',
-        'quantity': 5,
-        'expires_at': (datetime.utcnow() + timedelta(hours=24)).isoformat()
-    }
-    defaults.update(kwargs)
-    return defaults
+    if 'expires_at' not in kwargs:
+        kwargs['expires_at'] = (datetime.utcnow() + timedelta(hours=24)).isoformat()
+    return {**_RESERVATION_DEFAULTS, **kwargs}
 
 
 def generate_stock_adjustment_data(**kwargs):
     """Generate stock adjustment test data."""
-    defaults = {
-        'quantity': 10,
-        'movement_type': StockMovementType.IN.value,
-        'reference': 'REF001',
-        'reason': 'Test adjustment'
-    }
-    defaults.update(kwargs)
-    return defaults
+    return {**_STOCK_ADJUSTMENT_DEFAULTS, **kwargs}
@@ -1,7 +1,11 @@
 import pytest
 from datetime import datetime, timedelta
+from sqlalchemy import select
+from sqlalchemy.orm import selectinload
 from src.models import InventoryItem, Reservation, StockMovement, StockMovementType, ReservationStatus
-from tests.conftest import create_test_inventory_item, create_test_reservation, create_test_stock_movement
+from tests.unit.conftest import (
+    add_all_and_flush, create_test_inventory_item, create_test_reservation, create_test_stock_movement
+)
 
 
 class TestInventoryItem:
@@ -11,7 +15,6 @@ class TestInventoryItem:
         """Test creating an inventory item."""
         item = InventoryItem(
             sku='TEST-SKU-001',
-            product_id='TEST001',
             quantity_available=100,
             quantity_reserved=10,
             reorder_level=20,
@@ -19,11 +22,10 @@ class TestInventoryItem:
         )
         
         db_session.add(item)
-        db_session.commit()
+        db_session.flush()
         
         assert item.id is not None
         assert item.sku == 'TEST-SKU-001'
-        assert item.product_id == 'TEST001'
         assert item.quantity_available == 100
         assert item.quantity_reserved == 10
         assert item.reorder_level == 20
@@ -69,7 +71,6 @@ class TestInventoryItem:
         
         assert data['id'] == item.id
         assert data['sku'] == item.sku
-        assert data['product_id'] == item.product_id
         assert data['quantity_available'] == item.quantity_available
         assert data['quantity_reserved'] == item.quantity_reserved
         assert data['total_quantity'] == item.total_quantity
@@ -90,11 +91,10 @@ class TestInventoryItem:
         with pytest.raises(Exception):  # Should raise IntegrityError
             item2 = InventoryItem(
                 sku='UNIQUE-SKU-001',
-                product_id='DIFFERENT-PRODUCT',
                 quantity_available=50
             )
             db_session.add(item2)
-            db_session.commit()
+            db_session.flush()
 
 
 class TestReservation:
@@ -111,7 +111,7 @@ class TestReservation:
         )
         
         db_session.add(reservation)
-        db_session.commit()
+        db_session.flush()
         
         assert reservation.id is not None
         assert reservation.sku == sample_inventory_item.sku
@@ -122,17 +122,17 @@ class TestReservation:
         assert reservation.created_at is not None
         assert reservation.updated_at is not None
     
-    def test_is_expired_property(self, db_session, sample_inventory_item):
+    def test_is_expired_property(self, db_session, sample_inventory_item, now):
         """Test is_expired computed property."""
         # Expired reservation
         expired_reservation = Reservation(
             sku=sample_inventory_item.sku,
             order_id='ORDER001',
             quantity=5,
-            expires_at=datetime.utcnow() - timedelta(hours=1)
+            expires_at=now - timedelta(hours=1)
         )
         db_session.add(expired_reservation)
-        db_session.commit()
+        db_session.flush()
         
         assert expired_reservation.is_expired is True
         
@@ -141,18 +141,18 @@ class TestReservation:
             sku=sample_inventory_item.sku,
             order_id='ORDER002',
             quantity=5,
-            expires_at=datetime.utcnow() + timedelta(hours=1)
+            expires_at=now + timedelta(hours=1)
         )
         db_session.add(active_reservation)
-        db_session.commit()
+        db_session.flush()
         
         assert active_reservation.is_expired is False
     
     def test_product_id_property(self, db_session, sample_inventory_item):
-        """Test product_id property from related inventory item."""
+        """Test product_id property, which is the reserved item's SKU."""
         reservation = create_test_reservation(db_session, sample_inventory_item)
         
-        assert reservation.product_id == sample_inventory_item.product_id
+        assert reservation.product_id == sample_inventory_item.sku
     
     def test_to_dict_method(self, db_session, sample_inventory_item):
         """Test to_dict serialization method."""
@@ -170,28 +170,21 @@ class TestReservation:
         assert 'created_at' in data
         assert 'updated_at' in data
     
-    def test_reservation_statuses(self, db_session, sample_inventory_item):
+    @pytest.mark.parametrize('status', list(ReservationStatus))
+    def test_reservation_statuses(self, db_session, sample_inventory_item, status):
         """Test different reservation statuses."""
-        statuses = [
-            ReservationStatus.PENDING,
-            ReservationStatus.ACTIVE,
-            ReservationStatus.CONFIRMED,
-            ReservationStatus.RELEASED,
-            ReservationStatus.EXPIRED
-        ]
+        reservation = Reservation(
+            sku=sample_inventory_item.sku,
+            order_id=f'ORDER-{status.value}',
+            quantity=5,
+            status=status,
+            expires_at=datetime.utcnow() + timedelta(hours=24)
+        )
+        db_session.add(reservation)
+        db_session.flush()
+        db_session.expire(reservation)
         
-        for i, status in enumerate(statuses):
-            reservation = Reservation(
-                sku=sample_inventory_item.sku,
-                order_id=f'ORDER00{i}',
-                quantity=5,
-                status=status,
-                expires_at=datetime.utcnow() + timedelta(hours=24)
-            )
-            db_session.add(reservation)
-            db_session.commit()
-            
-            assert reservation.status == status
+        assert reservation.status == status
 
 
 class TestStockMovement:
@@ -208,7 +201,7 @@ class TestStockMovement:
         )
         
         db_session.add(movement)
-        db_session.commit()
+        db_session.flush()
         
         assert movement.id is not None
         assert movement.sku == sample_inventory_item.sku
@@ -233,47 +226,42 @@ class TestStockMovement:
         assert data['created_by'] == movement.created_by
         assert 'created_at' in data
     
-    def test_movement_types(self, db_session, sample_inventory_item):
+    @pytest.mark.parametrize('movement_type', list(StockMovementType))
+    def test_movement_types(self, db_session, sample_inventory_item, movement_type):
         """Test different movement types."""
-        movement_types = [
-            StockMovementType.IN,
-            StockMovementType.OUT,
-            StockMovementType.RESERVED,
-            StockMovementType.RELEASED,
-            StockMovementType.ADJUSTMENT
-        ]
+        movement = StockMovement(
+            sku=sample_inventory_item.sku,
+            movement_type=movement_type,
+            quantity=10,
+            reference=f'REF-{movement_type.value}'
+        )
+        db_session.add(movement)
+        db_session.flush()
+        db_session.expire(movement)
         
-        for i, movement_type in enumerate(movement_types):
-            movement = StockMovement(
-                sku=sample_inventory_item.sku,
-                movement_type=movement_type,
-                quantity=10,
-                reference=f'REF00{i}'
-            )
-            db_session.add(movement)
-            db_session.commit()
-            
-            assert movement.movement_type == movement_type
+        assert movement.movement_type == movement_type
 
 
 class TestModelRelationships:
     """Test relationships between models."""
     
-    def test_inventory_item_reservations_relationship(self, db_session):
+    def test_inventory_item_reservations_relationship(self, db_session, now):
         """Test one-to-many relationship between inventory item and reservations."""
         item = create_test_inventory_item(db_session)
         
-        # Create multiple reservations for the same item
-        reservation1 = create_test_reservation(
-            db_session, 
-            item, 
-            order_id='ORDER001'
-        )
-        reservation2 = create_test_reservation(
-            db_session, 
-            item, 
-            order_id='ORDER002'
-        )
+        # Create multiple reservations for the same item in one flush
+        reservation1, reservation2 = add_all_and_flush(db_session, [
+            Reservation(sku=item.sku, order_id=order_id, quantity=5,
+                        status=ReservationStatus.PENDING, expires_at=now + timedelta(hours=24))
+            for order_id in ('ORDER001', 'ORDER002')
+        ])
+        
+        # Load the collection with one SELECT ... IN
+        item = db_session.scalars(
+            select(InventoryItem)
+            .options(selectinload(InventoryItem.reservations))
+            .where(InventoryItem.id == item.id)
+        ).one()
         
         # Test relationship access
         assert len(item.reservations) == 2
@@ -288,19 +276,22 @@ class TestModelRelationships:
         """Test one-to-many relationship between inventory item and stock movements."""
         item = create_test_inventory_item(db_session)
         
-        # Create multiple stock movements for the same item
-        movement1 = create_test_stock_movement(
-            db_session, 
-            item,
-            movement_type=StockMovementType.IN,
-            reference='REF001'
-        )
-        movement2 = create_test_stock_movement(
-            db_session, 
-            item,
-            movement_type=StockMovementType.OUT,
-            reference='REF002'
-        )
+        # Create multiple stock movements for the same item in one flush
+        movement1, movement2 = add_all_and_flush(db_session, [
+            StockMovement(sku=item.sku, movement_type=movement_type, quantity=10,
+                          reference=reference, reason='Test movement', created_by='test')
+            for movement_type, reference in (
+                (StockMovementType.IN, 'REF001'),
+                (StockMovementType.OUT, 'REF002')
+            )
+        ])
+        
+        # Load the collection with one SELECT ... IN
+        item = db_session.scalars(
+            select(InventoryItem)
+            .options(selectinload(InventoryItem.stock_movements))
+            .where(InventoryItem.id == item.id)
+        ).one()
         
         # Test relationship access
         assert len(item.stock_movements) == 2
@@ -1,174 +1,132 @@
 import pytest
 from unittest.mock import patch, MagicMock
-from datetime import datetime, timedelta
+from datetime import timedelta
+from sqlalchemy import delete
 from sqlalchemy.exc import IntegrityError
 
-from src.repositories import InventoryRepository, ReservationRepository
 from src.models import InventoryItem, Reservation, StockMovement, StockMovementType, ReservationStatus
-from tests.conftest import create_test_inventory_item, create_test_reservation, create_test_stock_movement
+from tests.unit.conftest import (
+    FROZEN_NOW, bulk_create_inventory_items, create_test_inventory_item, create_test_reservation,
+    create_test_stock_movement
+)
 
 
 class TestInventoryRepository:
     """Test InventoryRepository implementations."""
     
-    def test_create_inventory_item(self, db_session):
+    def test_create_inventory_item(self, inventory_repo, db_session):
         """Test creating inventory item through repository."""
-        repo = InventoryRepository()
-        
         # Create item using the model directly (as the repo expects)
         item = InventoryItem(
-            sku='TEST-SKU-001',
-            product_id='REPO001',
+            sku='REPO-SKU-001',
             quantity_available=100,
             reorder_level=10
         )
         
-        created_item = repo.create(item)
+        created_item = inventory_repo.create(item)
         
         assert created_item.id is not None
-        assert created_item.product_id == 'REPO001'
+        assert created_item.sku == 'REPO-SKU-001'
         assert created_item.quantity_available == 100
     
-    def test_get_by_sku(self, db_session):
+    def test_get_by_sku(self, inventory_repo, db_session):
         """Test getting inventory item by SKU."""
-        repo = InventoryRepository()
         original_item = create_test_inventory_item(db_session, sku='GET-SKU-001')
         
-        retrieved_item = repo.get_by_sku('GET-SKU-001')
+        retrieved_item = inventory_repo.get_by_sku('GET-SKU-001')
         
         assert retrieved_item is not None
         assert retrieved_item.sku == 'GET-SKU-001'
         assert retrieved_item.id == original_item.id
     
-    def test_get_by_product_id(self, db_session):
-        """Test getting inventory item by product ID."""
-        repo = InventoryRepository()
-        original_item = create_test_inventory_item(db_session, product_id='PROD-001')
+    def test_get_by_sku_memoized_per_request(self, app, inventory_repo, db_session):
+        """Test SKU lookups are memoized within a request and not outside one."""
+        item = create_test_inventory_item(db_session, sku='MEMO-SKU-001')
         
-        retrieved_item = repo.get_by_product_id('PROD-001')
+        with app.test_request_context():
+            inventory_repo.get_by_sku('MEMO-SKU-001')
+            db_session.execute(delete(InventoryItem).where(InventoryItem.sku == 'MEMO-SKU-001'))
+            assert inventory_repo.get_by_sku('MEMO-SKU-001') is item
         
-        assert retrieved_item is not None
-        assert retrieved_item.product_id == 'PROD-001'
-        assert retrieved_item.id == original_item.id
+        # A background job or CLI task holds the app context, not a request, so it always reads the table
+        assert inventory_repo.get_by_sku('MEMO-SKU-001') is None
     
-    def test_get_by_id(self, db_session):
+    def test_get_multiple_by_skus(self, inventory_repo, db_session):
+        """Test getting several inventory items by SKU."""
+        bulk_create_inventory_items(db_session, [{'sku': 'MULTI-001'}, {'sku': 'MULTI-002'}, {'sku': 'MULTI-003'}])
+        
+        retrieved_items = inventory_repo.get_multiple_by_skus(['MULTI-001', 'MULTI-003', 'MISSING'])
+        
+        assert {item.sku for item in retrieved_items} == {'MULTI-001', 'MULTI-003'}
+    
+    def test_get_by_id(self, inventory_repo, db_session):
         """Test getting inventory item by ID."""
-        repo = InventoryRepository()
         original_item = create_test_inventory_item(db_session)
         
-        retrieved_item = repo.get_by_id(original_item.id)
+        retrieved_item = inventory_repo.get_by_id(original_item.id)
         
         assert retrieved_item is not None
         assert retrieved_item.id == original_item.id
     
-    def test_get_all_with_pagination(self, db_session):
+    def test_get_all_with_pagination(self, inventory_repo, db_session):
         """Test getting all items with pagination."""
-        repo = InventoryRepository()
-        
         # Create multiple test items
-        for i in range(5):
-            create_test_inventory_item(db_session, product_id=f'PAGINATE-{i:03d}')
+        bulk_create_inventory_items(db_session, [{'sku': f'PAGINATE-{i:03d}'} for i in range(5)])
         
-        items, total = repo.get_all(page=1, per_page=3)
+        items, total = inventory_repo.get_all(page=1, per_page=3)
         
         assert len(items) == 3
         assert total >= 5
     
-    def test_search_by_product_ids(self, db_session):
-        """Test searching by product IDs."""
-        repo = InventoryRepository()
-        
-        create_test_inventory_item(db_session, product_id='SEARCH001')
-        create_test_inventory_item(db_session, product_id='SEARCH002')
-        create_test_inventory_item(db_session, product_id='SEARCH003')
-        
-        items, total = repo.search(product_ids=['SEARCH001', 'SEARCH003'])
-        
-        assert len(items) == 2
-        assert total == 2
-        product_ids = [item.product_id for item in items]
-        assert 'SEARCH001' in product_ids
-        assert 'SEARCH003' in product_ids
-    
-    def test_search_low_stock(self, db_session):
-        """Test searching for low stock items."""
-        repo = InventoryRepository()
-        
-        # Create items with different stock levels
-        create_test_inventory_item(
-            db_session, 
-            product_id='LOW001',
-            quantity_available=5,
-            reorder_level=10
-        )
-        create_test_inventory_item(
-            db_session,
-            product_id='HIGH001',
-            quantity_available=50,
-            reorder_level=10
-        )
-        
-        items, total = repo.search(low_stock=True)
-        
-        assert len(items) >= 1
-        # Verify at least one item has low stock
-        low_stock_items = [item for item in items if item.quantity_available <= item.reorder_level]
-        assert len(low_stock_items) >= 1
+    @pytest.fixture
+    def mixed_inventory(self, db_session):
+        """One low-stock, one well-stocked and one out-of-stock item for the search tests."""
+        bulk_create_inventory_items(db_session, [
+            {'sku': 'SEARCH001', 'quantity_available': 5, 'reorder_level': 10},
+            {'sku': 'SEARCH002', 'quantity_available': 50, 'reorder_level': 10},
+            {'sku': 'SEARCH003', 'quantity_available': 0, 'reorder_level': 10}
+        ])
     
-    def test_search_out_of_stock(self, db_session):
-        """Test searching for out of stock items."""
-        repo = InventoryRepository()
-        
-        # Create out of stock item
-        create_test_inventory_item(
-            db_session,
-            product_id='OUT001',
-            quantity_available=0
-        )
-        create_test_inventory_item(
-            db_session,
-            product_id='IN001',
-            quantity_available=50
-        )
-        
-        items, total = repo.search(out_of_stock=True)
-        
-        assert len(items) >= 1
-        # Verify all returned items are out of stock
-        for item in items:
-            assert item.quantity_available == 0
+    @pytest.mark.parametrize('filters, expected_skus', [
+        pytest.param({'product_ids': ['SEARCH001', 'SEARCH003']}, {'SEARCH001', 'SEARCH003'}, id='product-ids'),
+        pytest.param({'low_stock': True}, {'SEARCH001', 'SEARCH003'}, id='low-stock'),
+        pytest.param({'out_of_stock': True}, {'SEARCH003'}, id='out-of-stock'),
+    ])
+    def test_search(self, inventory_repo, mixed_inventory, filters, expected_skus):
+        """Test searching by product IDs, low stock and out of stock."""
+        items, total = inventory_repo.search(**filters)
+        
+        assert {item.sku for item in items} == expected_skus
+        assert total == len(expected_skus)
     
-    def test_update_inventory_item(self, db_session):
+    def test_update_inventory_item(self, inventory_repo, db_session):
         """Test updating inventory item."""
-        repo = InventoryRepository()
         original_item = create_test_inventory_item(db_session, quantity_available=100)
         
         # Update the item
         original_item.quantity_available = 150
-        updated_item = repo.update(original_item)
+        updated_item = inventory_repo.update(original_item)
         
         assert updated_item.quantity_available == 150
         assert updated_item.updated_at is not None
     
-    def test_delete_inventory_item(self, db_session):
+    def test_delete_inventory_item(self, inventory_repo, db_session):
         """Test deleting inventory item."""
-        repo = InventoryRepository()
         item = create_test_inventory_item(db_session, sku='DELETE-ME')
         
-        success = repo.delete('DELETE-ME')
+        success = inventory_repo.delete('DELETE-ME')
         
         assert success is True
         
         # Verify item is deleted
-        deleted_item = repo.get_by_sku('DELETE-ME')
+        deleted_item = inventory_repo.get_by_sku('DELETE-ME')
         assert deleted_item is None
     
-    def test_create_stock_movement(self, db_session):
+    def test_create_stock_movement(self, inventory_repo, db_session):
         """Test creating stock movement."""
-        repo = InventoryRepository()
         item = create_test_inventory_item(db_session, sku='MOVEMENT-SKU')
         
-        movement = repo.create_stock_movement(
+        movement = inventory_repo.create_stock_movement(
             sku='MOVEMENT-SKU',
             movement_type=StockMovementType.IN,
             quantity=25,
@@ -181,46 +139,134 @@ class TestInventoryRepository:
         assert movement.quantity == 25
         assert movement.movement_type == StockMovementType.IN
     
-    def test_get_stock_movements(self, db_session):
+    def test_get_stock_movements(self, inventory_repo, db_session):
         """Test getting stock movements for SKU."""
-        repo = InventoryRepository()
         item = create_test_inventory_item(db_session, sku='HISTORY-SKU')
         
         # Create movements
         create_test_stock_movement(db_session, item, movement_type=StockMovementType.IN, quantity=50)
         create_test_stock_movement(db_session, item, movement_type=StockMovementType.OUT, quantity=10)
         
-        movements = repo.get_stock_movements('HISTORY-SKU')
+        movements = inventory_repo.get_stock_movements('HISTORY-SKU')
         
         assert len(movements) >= 2
         for movement in movements:
             assert movement.sku == 'HISTORY-SKU'
     
-    def test_bulk_update(self, db_session):
+    def test_bulk_update(self, inventory_repo, db_session):
         """Test bulk updating inventory items."""
-        repo = InventoryRepository()
-        
         # Create items
-        item1 = create_test_inventory_item(db_session, sku='BULK001')
-        item2 = create_test_inventory_item(db_session, sku='BULK002')
+        bulk_create_inventory_items(db_session, [{'sku': 'BULK001'}, {'sku': 'BULK002'}])
         
         updates = [
             {'sku': 'BULK001', 'quantity_available': 200},
             {'sku': 'BULK002', 'quantity_available': 300}
         ]
         
-        results = repo.bulk_update(updates)
+        results = inventory_repo.bulk_update(updates)
         
         assert len(results) == 2
-        assert all(result['success'] for result in results)
+        assert {result['success'] for result in results} == {True}
+
+    
+    def test_reserve_stock_bulk(self, inventory_repo, db_session, now):
+        """Test reserving stock moves units from available to reserved and records movements."""
+        item = create_test_inventory_item(db_session, sku='BULK-RES-001', quantity_available=10)
+        reservations = [
+            Reservation(sku='BULK-RES-001', order_id='ORDER-BULK', quantity=quantity,
+                        status=ReservationStatus.PENDING, expires_at=now + timedelta(minutes=30))
+            for quantity in (3, 4)
+        ]
+        
+        inventory_repo.reserve_stock_bulk(reservations, reference='ORDER-BULK')
+        
+        db_session.refresh(item)
+        assert item.quantity_available == 3
+        assert item.quantity_reserved == 7
+        assert Reservation.query.filter_by(order_id='ORDER-BULK').count() == 2
+        movements = inventory_repo.get_stock_movements('BULK-RES-001')
+        assert sorted(m.quantity for m in movements) == [3, 4]
+        assert all(m.movement_type == StockMovementType.RESERVED for m in movements)
+    
+    @pytest.mark.parametrize('lines, error', [
+        # Two lines that fit on their own but not together
+        ([('BULK-RES-002', 3), ('BULK-RES-002', 3)], 'Insufficient stock for SKU BULK-RES-002'),
+        ([('BULK-RES-002', 1), ('BULK-MISSING', 1)], 'Product with SKU BULK-MISSING not found'),
+    ])
+    def test_reserve_stock_bulk_rejected(self, inventory_repo, db_session, now, lines, error):
+        """Test a rejected bulk reservation leaves stock, reservations and movements untouched."""
+        create_test_inventory_item(db_session, sku='BULK-RES-002', quantity_available=5)
+        # The repository rolls back on failure; keep the item out of the rolled-back savepoint
+        db_session.commit()
+        reservations = [
+            Reservation(sku=sku, order_id='ORDER-BULK-REJECT', quantity=quantity,
+                        status=ReservationStatus.PENDING, expires_at=now + timedelta(minutes=30))
+            for sku, quantity in lines
+        ]
+        
+        with pytest.raises(ValueError, match=error):
+            inventory_repo.reserve_stock_bulk(reservations)
+        
+        item = inventory_repo.get_by_sku('BULK-RES-002')
+        assert item.quantity_available == 5
+        assert item.quantity_reserved == 0
+        assert Reservation.query.filter_by(order_id='ORDER-BULK-REJECT').count() == 0
+        assert inventory_repo.get_stock_movements('BULK-RES-002') == []
+    
+    def test_transition_reservations_release(self, inventory_repo, db_session):
+        """Test releasing reservations returns their stock to available."""
+        item = create_test_inventory_item(
+            db_session, sku='TRANS-SKU-001', quantity_available=5, quantity_reserved=8
+        )
+        reservations = [
+            create_test_reservation(db_session, item, order_id='ORDER-TRANS-1', quantity=3),
+            create_test_reservation(db_session, item, order_id='ORDER-TRANS-2', quantity=5),
+        ]
+        
+        inventory_repo.transition_reservations(
+            reservations, ReservationStatus.CANCELLED, StockMovementType.RELEASED,
+            reason="Released for order {order_id}"
+        )
+        
+        db_session.refresh(item)
+        assert item.quantity_available == 13
+        assert item.quantity_reserved == 0
+        for reservation in reservations:
+            db_session.refresh(reservation)
+            assert reservation.status == ReservationStatus.CANCELLED
+        reasons = {m.reason for m in inventory_repo.get_stock_movements('TRANS-SKU-001')}
+        assert reasons == {'Released for order ORDER-TRANS-1', 'Released for order ORDER-TRANS-2'}
+    
+    @pytest.mark.parametrize('reservation_kwargs, unexpired_only', [
+        ({'status': ReservationStatus.CONFIRMED}, False),
+        ({'expires_at': FROZEN_NOW.replace(tzinfo=None) - timedelta(minutes=1)}, True),
+    ])
+    def test_transition_reservations_rejected(self, inventory_repo, db_session, now,
+                                              reservation_kwargs, unexpired_only):
+        """Test a reservation that is no longer pending (or has expired) is not transitioned."""
+        item = create_test_inventory_item(
+            db_session, sku='TRANS-SKU-002', quantity_available=10, quantity_reserved=4
+        )
+        reservation = create_test_reservation(db_session, item, quantity=4, **reservation_kwargs)
+        db_session.commit()
+        original_status = reservation.status
+        
+        with pytest.raises(ValueError, match='no longer pending'):
+            inventory_repo.transition_reservations(
+                [reservation], ReservationStatus.CONFIRMED, StockMovementType.OUT,
+                unexpired_only=unexpired_only
+            )
+        
+        assert reservation.status == original_status
+        assert item.quantity_available == 10
+        assert item.quantity_reserved == 4
 
 
 class TestReservationRepository:
     """Test ReservationRepository implementations."""
     
-    def test_create_reservation(self, db_session):
+    def test_create_reservation(self, reservation_repo, db_session, now):
         """Test creating reservation through repository."""
-        repo = ReservationRepository()
         inventory_item = create_test_inventory_item(db_session, sku='RESERVE-SKU')
         
         reservation = Reservation(
@@ -228,92 +274,123 @@ class TestReservationRepository:
             order_id='ORDER001',
             quantity=10,
             status=ReservationStatus.PENDING,
-            expires_at=datetime.utcnow() + timedelta(hours=24)
+            expires_at=now + timedelta(hours=24)
         )
         
-        created_reservation = repo.create(reservation)
+        created_reservation = reservation_repo.create(reservation)
         
         assert created_reservation.id is not None
         assert created_reservation.order_id == 'ORDER001'
         assert created_reservation.quantity == 10
     
-    def test_get_by_id(self, db_session):
+    def test_get_by_id(self, reservation_repo, db_session):
         """Test getting reservation by ID."""
-        repo = ReservationRepository()
         inventory_item = create_test_inventory_item(db_session, sku='RESERVE-SKU')
         original_reservation = create_test_reservation(db_session, inventory_item)
         
-        retrieved_reservation = repo.get_by_id(original_reservation.id)
+        retrieved_reservation = reservation_repo.get_by_id(original_reservation.id)
         
         assert retrieved_reservation is not None
         assert retrieved_reservation.id == original_reservation.id
     
-    def test_get_by_order_id(self, db_session):
+    def test_get_by_order_id(self, reservation_repo, db_session):
         """Test getting reservations by order ID."""
-        repo = ReservationRepository()
         inventory_item = create_test_inventory_item(db_session, sku='RESERVE-SKU')
         
         # Create multiple reservations for same order
         create_test_reservation(db_session, inventory_item, order_id='ORDER123')
         create_test_reservation(db_session, inventory_item, order_id='ORDER123', quantity=15)
         
-        reservations = repo.get_by_order_id('ORDER123')
+        reservations = reservation_repo.get_by_order_id('ORDER123')
         
         assert len(reservations) == 2
         for reservation in reservations:
             assert reservation.order_id == 'ORDER123'
     
-    def test_update_reservation_status(self, db_session):
+    def test_update_reservation_status(self, reservation_repo, db_session):
         """Test updating reservation status."""
-        repo = ReservationRepository()
         inventory_item = create_test_inventory_item(db_session, sku='RESERVE-SKU')
         reservation = create_test_reservation(db_session, inventory_item)
         
-        updated_reservation = repo.update_status(reservation.id, ReservationStatus.CONFIRMED)
+        updated_reservation = reservation_repo.update_status(reservation.id, ReservationStatus.CONFIRMED)
         
         assert updated_reservation is not None
         assert updated_reservation.status == ReservationStatus.CONFIRMED
     
-    def test_cancel_reservation(self, db_session):
+    def test_cancel_reservation(self, reservation_repo, db_session):
         """Test cancelling a reservation."""
-        repo = ReservationRepository()
         inventory_item = create_test_inventory_item(db_session, sku='RESERVE-SKU')
         reservation = create_test_reservation(db_session, inventory_item)
         
-        cancelled_reservation = repo.cancel(reservation.id)
+        cancelled_reservation = reservation_repo.cancel(reservation.id)
         
         assert cancelled_reservation is not None
         assert cancelled_reservation.status == ReservationStatus.CANCELLED
     
-    def test_get_expired_reservations(self, db_session):
+    def test_get_expired_reservations(self, reservation_repo, db_session, now):
         """Test getting expired reservations."""
-        repo = ReservationRepository()
         inventory_item = create_test_inventory_item(db_session, sku='RESERVE-SKU')
         
         # Create expired reservation
         expired_reservation = create_test_reservation(
             db_session, 
             inventory_item, 
-            expires_at=datetime.utcnow() - timedelta(hours=1),
+            expires_at=now - timedelta(hours=1),
             status=ReservationStatus.PENDING
         )
         
-        expired_reservations = repo.get_expired_reservations()
+        expired_reservations = reservation_repo.get_expired_reservations()
         
         assert len(expired_reservations) >= 1
         expired_ids = [r.id for r in expired_reservations]
         assert expired_reservation.id in expired_ids
     
-    def test_bulk_confirm(self, db_session):
+    def test_get_expired_reservations_batch(self, reservation_repo, db_session, now):
+        """Test getting expired reservations in batches, longest-expired first."""
+        inventory_item = create_test_inventory_item(db_session, sku='RESERVE-SKU')
+        
+        for i, hours_ago in enumerate([1, 3, 2]):
+            create_test_reservation(
+                db_session,
+                inventory_item,
+                order_id=f'ORDER00{i}',
+                expires_at=now - timedelta(hours=hours_ago),
+                status=ReservationStatus.PENDING
+            )
+        
+        batch = reservation_repo.get_expired_reservations(batch_size=2, skip_locked=True)
+        
+        assert [r.order_id for r in batch] == ['ORDER001', 'ORDER002']
+    
+    @pytest.mark.parametrize('max_chunks, expected_deleted', [(None, 5), (1, 2)])
+    def test_delete_expired(self, reservation_repo, db_session, now, max_chunks, expected_deleted):
+        """Test old expired reservations are deleted in chunks, leaving recent or pending ones."""
+        inventory_item = create_test_inventory_item(db_session, sku='PURGE-SKU')
+        cutoff = now - timedelta(hours=24)
+        for i in range(5):
+            create_test_reservation(db_session, inventory_item, order_id=f'PURGE-{i}',
+                                    status=ReservationStatus.EXPIRED, updated_at=cutoff - timedelta(hours=1))
+        create_test_reservation(db_session, inventory_item, order_id='KEEP-RECENT',
+                                status=ReservationStatus.EXPIRED, updated_at=cutoff + timedelta(hours=1))
+        create_test_reservation(db_session, inventory_item, order_id='KEEP-PENDING',
+                                updated_at=cutoff - timedelta(hours=1))
+        
+        deleted = reservation_repo.delete_expired(cutoff, chunk_size=2, max_chunks=max_chunks)
+        
+        assert deleted == expected_deleted
+        remaining = {r.order_id for r in Reservation.query.filter_by(sku='PURGE-SKU')}
+        assert len(remaining) == 7 - expected_deleted
+        assert {'KEEP-RECENT', 'KEEP-PENDING'} <= remaining
+    
+    def test_bulk_confirm(self, reservation_repo, db_session):
         """Test bulk confirming reservations."""
-        repo = ReservationRepository()
         inventory_item = create_test_inventory_item(db_session, sku='RESERVE-SKU')
         
         # Create reservations
         reservation1 = create_test_reservation(db_session, inventory_item)
         reservation2 = create_test_reservation(db_session, inventory_item, order_id='ORDER002')
         
-        results = repo.bulk_confirm([reservation1.id, reservation2.id])
+        results = reservation_repo.bulk_confirm([reservation1.id, reservation2.id])
         
         assert len(results) == 2
         assert all(result['success'] for result in results)
@@ -3,21 +3,30 @@
 Simple script to test all health endpoints
 """
 
-from src.api.main import create_app
+import sys
+
+from src import create_app
+
+_IGNORED_METHODS = frozenset({'HEAD', 'OPTIONS'})
+
 
 def test_routes():
     app = create_app()
+    # Output is collected and written once at the end instead of one print per line
+    lines = []
     
-    print('=== Available Routes ===')
-    routes = []
-    for rule in app.url_map.iter_rules():
-        methods = [m for m in rule.methods if m not in ['HEAD', 'OPTIONS']]
-        routes.append((rule.rule, methods))
-        print(f'{rule.rule:<40} -> {methods}')
+    lines.append('=== Available Routes ===')
+    app.url_map.update()
+    routes = [
+        (rule.rule, sorted(rule.methods - _IGNORED_METHODS))
+        for rule in app.url_map.iter_rules()
+    ]
+    for rule, methods in routes:
+        lines.append(f'{rule:<40} -> {methods}')
     
-    print(f'\nTotal routes: {len(routes)}')
+    lines.append(f'\nTotal routes: {len(routes)}')
     
-    print('\n=== Testing Health Endpoints ===')
+    lines.append('\n=== Testing Health Endpoints ===')
     with app.test_client() as client:
         # Test direct health endpoints (outside /api/v1)
         direct_endpoints = [
@@ -27,13 +36,13 @@ def test_routes():
             '/metrics'
         ]
         
-        print('\nDirect endpoints (outside /api/v1):')
+        lines.append('\nDirect endpoints (outside /api/v1):')
         for endpoint in direct_endpoints:
             try:
                 response = client.get(endpoint)
-                print(f'  {endpoint:<20}: {response.status_code}')
+                lines.append(f'  {endpoint:<20}: {response.status_code}')
             except Exception as e:
-                print(f'  {endpoint:<20}: ERROR - {e}')
+                lines.append(f'  {endpoint:<20}: ERROR - {e}')
         
         # Test API v1 health endpoints 
         api_endpoints = [
@@ -45,13 +54,15 @@ def test_routes():
             '/api/v1/metrics'
         ]
         
-        print('\nAPI v1 endpoints:')
+        lines.append('\nAPI v1 endpoints:')
         for endpoint in api_endpoints:
             try:
                 response = client.get(endpoint)
-                print(f'  {endpoint:<30}: {response.status_code}')
+                lines.append(f'  {endpoint:<30}: {response.status_code}')
             except Exception as e:
-                print(f'  {endpoint:<30}: ERROR - {e}')
+                lines.append(f'  {endpoint:<30}: ERROR - {e}')
+    
+    sys.stdout.write('\n'.join(lines) + '\n')
 
 if __name__ == '__main__':
     test_routes()
@@ -1,58 +1,53 @@
 import pytest
-from unittest.mock import patch, MagicMock
+from unittest.mock import DEFAULT, MagicMock, patch
 from datetime import datetime, timedelta
+from sqlalchemy.exc import IntegrityError
 
-from src.services import InventoryService
 from src.models import InventoryItem, Reservation, StockMovementType, ReservationStatus
-from tests.conftest import create_test_inventory_item, create_test_reservation
+from src.services.inventory_events_service import InventoryEventsService
+from tests.unit.conftest import TEST_PRODUCT, create_test_inventory_item, create_test_reservation
 
 
+@pytest.mark.usefixtures('mock_product_service')
 class TestInventoryService:
     """Test InventoryService business logic."""
     
-    def test_get_inventory_by_product_id(self, db_session):
+    def test_get_inventory_by_product_id(self, inventory_service, db_session):
         """Test getting inventory by product ID."""
-        service = InventoryService()
-        create_test_inventory_item(db_session, product_id='SERVICE001')
+        create_test_inventory_item(db_session, sku='SERVICE001')
         
-        result = service.get_inventory_by_product_id('SERVICE001')
+        result = inventory_service.get_inventory_by_product_id('SERVICE001')
         
         assert result is not None
-        assert result['product_id'] == 'SERVICE001'
+        assert result['sku'] == 'SERVICE001'
+        assert result['product'] == TEST_PRODUCT
     
-    def test_create_inventory_item(self, db_session):
+    def test_create_inventory_item(self, inventory_service, db_session):
         """Test creating inventory item through service."""
-        service = InventoryService()
-        
-        item = service.create_inventory_item(
-            product_id='CREATE001',
+        item = inventory_service.create_inventory_item(
+            sku='CREATE001',
             quantity_available=50,
             reorder_level=10
         )
         
-        assert item['product_id'] == 'CREATE001'
+        assert item['sku'] == 'CREATE001'
         assert item['quantity_available'] == 50
     
-    def test_create_inventory_item_duplicate(self, db_session):
+    def test_create_inventory_item_duplicate(self, inventory_service, db_session):
         """Test creating duplicate inventory item."""
-        service = InventoryService()
-        
-        # Create first item
-        service.create_inventory_item(product_id='DUP001')
+        inventory_service.create_inventory_item(sku='DUP-001')
         
-        # Create item with same SKU should work (different product_id)
-        item2 = service.create_inventory_item(product_id='DUP002')
-        assert item2 is not None
+        # SKUs are unique, so a second item with the same SKU is rejected
+        with pytest.raises(ValueError, match='already exists'):
+            inventory_service.create_inventory_item(sku='DUP-001')
     
-    def test_update_inventory_item(self, db_session):
+    def test_update_inventory_item(self, inventory_service, db_session):
         """Test updating inventory item."""
-        service = InventoryService()
-        
         # First create an item
-        created = service.create_inventory_item(product_id='UPDATE001')
+        created = inventory_service.create_inventory_item(sku='UPDATE001')
         
         # Update it
-        updated_item = service.update_inventory_item(
+        updated_item = inventory_service.update_inventory_item(
             'UPDATE001',
             quantity_available=200,
             reorder_level=20
@@ -61,87 +56,69 @@ class TestInventoryService:
         assert updated_item['quantity_available'] == 200
         assert updated_item['reorder_level'] == 20
     
-    def test_adjust_stock(self, db_session):
-        """Test adjusting stock levels."""
-        service = InventoryService()
-        item = create_test_inventory_item(db_session, sku='ADJUST001', quantity_available=100)
-        
-        movement = service.adjust_stock(
-            sku='ADJUST001',
-            quantity=50,
-            movement_type=StockMovementType.IN,
-            reference='RESTOCK001'
+    @pytest.mark.parametrize('available, movement_type, quantity, reference, error', [
+        pytest.param(100, StockMovementType.IN, 50, 'RESTOCK001', None, id='inbound'),
+        pytest.param(100, StockMovementType.OUT, 30, 'SALE001', None, id='outbound'),
+        pytest.param(10, StockMovementType.OUT, 50, None, 'Insufficient stock', id='insufficient-quantity'),
+    ])
+    def test_adjust_stock(self, inventory_service, db_session, available, movement_type, quantity, reference, error):
+        """Test adjusting stock levels in both directions, and rejecting overdrawn stock."""
+        item = create_test_inventory_item(db_session, quantity_available=available)
+        
+        if error:
+            with pytest.raises(ValueError, match=error):
+                inventory_service.adjust_stock(
+                    sku=item.sku,
+                    quantity=quantity,
+                    movement_type=movement_type,
+                    reference=reference
+                )
+            return
+        
+        movement = inventory_service.adjust_stock(
+            sku=item.sku,
+            quantity=quantity,
+            movement_type=movement_type,
+            reference=reference
         )
         
-        assert movement['quantity'] == 50
-        assert movement['movement_type'] == StockMovementType.IN.value
-    
-    def test_adjust_stock_outbound(self, db_session):
-        """Test outbound stock adjustment."""
-        service = InventoryService()
-        item = create_test_inventory_item(db_session, sku='OUT001', quantity_available=100)
-        
-        movement = service.adjust_stock(
-            sku='OUT001',
-            quantity=30,
-            movement_type=StockMovementType.OUT,
-            reference='SALE001'
-        )
-        
-        assert movement['quantity'] == 30
-        assert movement['movement_type'] == StockMovementType.OUT.value
-    
-    def test_adjust_stock_insufficient_quantity(self, db_session):
-        """Test adjusting stock with insufficient quantity."""
-        service = InventoryService()
-        create_test_inventory_item(db_session, sku='LOW001', quantity_available=10)
-        
-        with pytest.raises(ValueError, match="Insufficient stock"):
-            service.adjust_stock(
-                sku='LOW001',
-                quantity=50,
-                movement_type=StockMovementType.OUT
-            )
+        assert movement['quantity'] == quantity
+        assert movement['movement_type'] == movement_type.value
     
-    def test_check_availability(self, db_session):
+    def test_check_availability(self, inventory_service, db_session):
         """Test checking stock availability."""
-        service = InventoryService()
         item = create_test_inventory_item(db_session, sku='CHECK001', quantity_available=25)
         
-        result = service.check_availability('CHECK001', 20)
+        result = inventory_service.check_availability('CHECK001', 20)
         
         assert result['available'] is True
         assert result['available_quantity'] == 25
         assert result['requested_quantity'] == 20
     
-    def test_search_inventory_advanced(self, db_session):
+    def test_search_inventory_advanced(self, inventory_service, db_session):
         """Test advanced inventory search."""
-        service = InventoryService()
-        
         # Create test items
         create_test_inventory_item(
             db_session, 
-            product_id='SEARCH001',
+            sku='SEARCH001',
             quantity_available=5,
             reorder_level=10
         )
         create_test_inventory_item(
             db_session,
-            product_id='SEARCH002',
+            sku='SEARCH002',
             quantity_available=50,
             reorder_level=10
         )
         
         # Search for low stock
-        items, total = service.search_inventory_advanced(low_stock=True)
+        items, total = inventory_service.search_inventory_advanced(low_stock=True)
         
         assert total >= 1
         assert len(items) >= 1
     
-    def test_bulk_update_inventory(self, db_session):
+    def test_bulk_update_inventory(self, inventory_service, db_session):
         """Test bulk updating inventory."""
-        service = InventoryService()
-        
         # Create items
         create_test_inventory_item(db_session, sku='BULK001')
         create_test_inventory_item(db_session, sku='BULK002')
@@ -151,27 +128,27 @@ class TestInventoryService:
             {'sku': 'BULK002', 'quantity_available': 200}
         ]
         
-        results = service.bulk_update_inventory(operations)
+        results = inventory_service.bulk_update_inventory(operations)
         
         assert len(results) == 2
-        assert all(result['success'] for result in results)
+        assert {result['success'] for result in results} == {True}
     
-    def test_get_inventory_with_product_details(self, db_session):
+    def test_get_inventory_with_product_details(self, inventory_service, db_session):
         """Test getting inventory with product details."""
-        service = InventoryService()
-        create_test_inventory_item(db_session, product_id='ENRICHED001')
+        create_test_inventory_item(db_session, sku='ENRICHED001')
         
-        enriched_item = service.get_inventory_with_product_details('ENRICHED001')
+        enriched_item = inventory_service.get_inventory_with_product_details('ENRICHED001')
         
         assert enriched_item is not None
-        assert enriched_item['product_id'] == 'ENRICHED001'
+        assert enriched_item['sku'] == 'ENRICHED001'
+        assert enriched_item['product_details'] == TEST_PRODUCT
     
-    def test_health_check(self, db_session):
+    def test_health_check(self, inventory_service):
         """Test health check."""
-        service = InventoryService()
-        
-        health_data = service.health_check()
+        with patch('src.services.inventory_service.InventoryItem') as mock_model:
+            health_data = inventory_service.health_check()
         
+        mock_model.query.first.assert_called_once()
         assert health_data['status'] == 'healthy'
         assert 'timestamp' in health_data
 
@@ -179,13 +156,15 @@ class TestInventoryService:
 class TestReservationService:
     """Test reservation methods in InventoryService."""
     
-    def test_create_reservation(self, db_session):
+    @pytest.fixture
+    def stock_sku(self, db_session):
+        """SKU of an item with plenty of stock for reservation tests."""
+        return create_test_inventory_item(db_session, quantity_available=1000).sku
+    
+    def test_create_reservation(self, inventory_service, stock_sku):
         """Test creating a reservation."""
-        service = InventoryService()
-        item = create_test_inventory_item(db_session, sku='RESERVE001', quantity_available=100)
-        
-        reservation = service.create_reservation(
-            sku='RESERVE001',
+        reservation = inventory_service.create_reservation(
+            sku=stock_sku,
             order_id='ORDER001',
             quantity=10
         )
@@ -194,105 +173,299 @@ class TestReservationService:
         assert reservation['quantity'] == 10
         assert reservation['status'] == ReservationStatus.PENDING.value
     
-    def test_create_reservation_insufficient_stock(self, db_session):
+    def test_create_reservation_insufficient_stock(self, inventory_service, db_session):
         """Test creating reservation with insufficient stock."""
-        service = InventoryService()
         create_test_inventory_item(db_session, sku='LOW001', quantity_available=5)
         
         with pytest.raises(ValueError, match="Insufficient stock"):
-            service.create_reservation(
+            inventory_service.create_reservation(
                 sku='LOW001',
                 order_id='ORDER002',
                 quantity=10
             )
     
-    def test_confirm_reservation(self, db_session):
+    def test_confirm_reservation(self, inventory_service, stock_sku):
         """Test confirming a reservation."""
-        service = InventoryService()
-        inventory_item = create_test_inventory_item(db_session, sku='CONFIRM001')
-        
         # Create reservation
-        reservation = service.create_reservation(
-            sku='CONFIRM001',
+        reservation = inventory_service.create_reservation(
+            sku=stock_sku,
             order_id='ORDER003',
             quantity=10
         )
         
         # Confirm it
-        result = service.confirm_reservation(reservation['id'], 'ORDER003')
+        result = inventory_service.confirm_reservation(reservation['id'], 'ORDER003')
         
         assert result is True
     
-    def test_cancel_reservation(self, db_session):
+    def test_cancel_reservation(self, inventory_service, stock_sku):
         """Test cancelling a reservation."""
-        service = InventoryService()
-        inventory_item = create_test_inventory_item(db_session, sku='CANCEL001')
-        
         # Create reservation
-        reservation = service.create_reservation(
-            sku='CANCEL001',
+        reservation = inventory_service.create_reservation(
+            sku=stock_sku,
             order_id='ORDER004',
             quantity=10
         )
         
         # Cancel it
-        result = service.cancel_reservation(reservation['id'])
+        result = inventory_service.cancel_reservation(reservation['id'])
         
         assert result is True
     
-    def test_confirm_reservations_bulk(self, db_session):
+    def test_confirm_reservations_bulk(self, inventory_service, stock_sku):
         """Test bulk confirming reservations."""
-        service = InventoryService()
-        inventory_item = create_test_inventory_item(db_session, sku='BULK-RES001')
-        
         # Create reservations
-        res1 = service.create_reservation('BULK-RES001', 'ORDER005', 5)
-        res2 = service.create_reservation('BULK-RES001', 'ORDER006', 5)
+        res1 = inventory_service.create_reservation(stock_sku, 'ORDER005', 5)
+        res2 = inventory_service.create_reservation(stock_sku, 'ORDER006', 5)
         
-        results = service.confirm_reservations_bulk([res1['id'], res2['id']])
+        results = inventory_service.confirm_reservations_bulk([res1['id'], res2['id']])
         
         assert len(results) == 2
         assert all(result['success'] for result in results)
     
-    def test_search_reservations(self, db_session):
+    def test_search_reservations(self, inventory_service, stock_sku):
         """Test searching reservations."""
-        service = InventoryService()
-        inventory_item = create_test_inventory_item(db_session, sku='SEARCH-RES001')
-        
         # Create reservations
-        service.create_reservation('SEARCH-RES001', 'SEARCH-ORDER', 5)
+        inventory_service.create_reservation(stock_sku, 'SEARCH-ORDER', 5)
         
-        results = service.search_reservations(order_id='SEARCH-ORDER')
+        results = inventory_service.search_reservations(order_id='SEARCH-ORDER')
         
         assert len(results) >= 1
         assert all(r['order_id'] == 'SEARCH-ORDER' for r in results)
     
-    def test_expire_reservations(self, db_session):
+    def test_expire_reservations(self, inventory_service):
         """Test processing expired reservations."""
-        service = InventoryService()
+        # This is mostly a system process, so just test its result shape with nothing to expire
+        with patch.object(inventory_service, 'reservation_repo') as mock_repo:
+            mock_repo.get_expired_reservations.return_value = []
+            result = inventory_service.expire_reservations()
         
-        # This is mostly a system process, so just test it doesn't error
-        result = service.expire_reservations()
-        
-        assert 'processed_count' in result
+        assert result['processed_count'] == 0
+        assert result['failed_batches'] == 0
         assert 'processed_at' in result
     
-    def test_get_reservation_not_found(self, db_session):
+    def test_process_expired_reservations_failed_batch(self, inventory_service):
+        """Test a failing batch ends the run without losing the batches already committed."""
+        batches = [[MagicMock(id=f'R{i}-{j}') for j in range(2)] for i in range(3)]
+        
+        with patch.multiple(inventory_service, reservation_repo=DEFAULT, inventory_repo=DEFAULT) as mocks:
+            mocks['reservation_repo'].get_expired_reservations.side_effect = batches
+            mocks['inventory_repo'].transition_reservations.side_effect = [None, Exception('deadlock')]
+            result = inventory_service.process_expired_reservations(batch_size=2)
+        
+        assert result['processed_count'] == 2
+        assert result['failed_batches'] == 1
+        assert mocks['reservation_repo'].get_expired_reservations.call_count == 2
+    
+    def test_get_reservation_not_found(self, inventory_service, db_session):
         """Test getting non-existent reservation."""
-        service = InventoryService()
-        
-        result = service.get_reservation('non-existent-id')
+        result = inventory_service.get_reservation('non-existent-id')
         
         assert result is None
     
-    def test_confirm_reservation_wrong_order(self, db_session):
+    def test_confirm_reservation_wrong_order(self, inventory_service, stock_sku):
         """Test confirming reservation with wrong order ID."""
-        service = InventoryService()
-        inventory_item = create_test_inventory_item(db_session, sku='WRONG-ORDER')
-        
         # Create reservation
-        reservation = service.create_reservation('WRONG-ORDER', 'ORDER-CORRECT', 5)
+        reservation = inventory_service.create_reservation(stock_sku, 'ORDER-CORRECT', 5)
         
         # Try to confirm with wrong order ID
         with pytest.raises(ValueError, match="Order ID mismatch"):
-            service.confirm_reservation(reservation['id'], 'ORDER-WRONG')
+            inventory_service.confirm_reservation(reservation['id'], 'ORDER-WRONG')
+
+    
+    def test_create_reservation_unknown_sku(self, inventory_service, db_session):
+        """Test creating a reservation for an SKU with no inventory item."""
+        with pytest.raises(ValueError, match="Product with SKU MISSING-SKU not found"):
+            inventory_service.create_reservation(sku='MISSING-SKU', order_id='ORDER-MISSING', quantity=1)
+        
+        assert inventory_service.search_reservations(order_id='ORDER-MISSING') == []
+    
+    def test_cancel_reservation_releases_stock(self, inventory_service, db_session):
+        """Test cancelling a pending reservation returns its stock to available."""
+        create_test_inventory_item(db_session, sku='RELEASE001', quantity_available=20)
+        reservation = inventory_service.create_reservation('RELEASE001', 'ORDER-RELEASE', 8)
+        
+        assert inventory_service.cancel_reservation(reservation['id']) is True
+        
+        item = inventory_service.get_inventory_by_sku('RELEASE001')
+        assert item['quantity_available'] == 20
+        assert item['quantity_reserved'] == 0
+        assert inventory_service.get_reservation(reservation['id'])['status'] == ReservationStatus.CANCELLED.value
+    
+    def test_confirm_reservation_expired(self, inventory_service, db_session):
+        """Test confirming an expired reservation is rejected without moving stock."""
+        item = create_test_inventory_item(db_session, sku='EXPIRED001', quantity_available=10, quantity_reserved=4)
+        reservation = create_test_reservation(
+            db_session, item, order_id='ORDER-EXPIRED', quantity=4,
+            expires_at=datetime.utcnow() - timedelta(minutes=1)
+        )
+        # The failed transition rolls back; keep the fixtures out of the rolled-back savepoint
+        db_session.commit()
+        
+        with pytest.raises(ValueError, match="Reservation has expired"):
+            inventory_service.confirm_reservation(reservation.id, 'ORDER-EXPIRED')
+        
+        assert reservation.status == ReservationStatus.PENDING
+        assert item.quantity_available == 10
+        assert item.quantity_reserved == 4
+    
+    def test_confirm_reservations_bulk_rejected(self, inventory_service, stock_sku, db_session):
+        """Test a repeated ID is confirmed once and expired reservations are reported, not confirmed."""
+        reservation = inventory_service.create_reservation(stock_sku, 'ORDER-DUP', 5)
+        expired = create_test_reservation(
+            db_session, InventoryItem.query.filter_by(sku=stock_sku).one(), order_id='ORDER-LATE',
+            expires_at=datetime.utcnow() - timedelta(minutes=1)
+        )
+        
+        results = inventory_service.confirm_reservations_bulk([reservation['id'], reservation['id'], expired.id])
+        
+        assert results == [
+            {'reservation_id': reservation['id'], 'success': True},
+            {'reservation_id': reservation['id'], 'success': False, 'error': 'Reservation is not pending'},
+            {'reservation_id': expired.id, 'success': False, 'error': 'Reservation has expired'},
+        ]
+        assert inventory_service.get_reservation(reservation['id'])['status'] == ReservationStatus.CONFIRMED.value
+        assert inventory_service.get_reservation(expired.id)['status'] == ReservationStatus.PENDING.value
+    
+    def test_reserve_stock_for_order_insufficient_stock(self, inventory_service, db_session):
+        """Test repeated SKUs in an order are checked against their combined quantity."""
+        create_test_inventory_item(db_session, sku='ORDERSKU001', quantity_available=5)
+        
+        result = inventory_service.reserve_stock_for_order(
+            'ORDER-SHORT', [{'sku': 'ORDERSKU001', 'quantity': 3}, {'sku': 'ORDERSKU001', 'quantity': 3}]
+        )
+        
+        assert result['success'] is False
+        assert result['requested'] == 6
+        assert result['available'] == 5
+        assert inventory_service.search_reservations(order_id='ORDER-SHORT') == []
+
+
+class TestInventoryEventsService:
+    """Test InventoryEventsService event handlers."""
+    
+    @pytest.fixture(autouse=True)
+    def event_publisher(self):
+        """Capture published events instead of sending them to the broker."""
+        with patch('src.services.inventory_events_service.event_publisher') as mock_publisher:
+            yield mock_publisher
+    
+    def test_product_created(self, db_session, event_publisher):
+        """Test product.created initializes an empty inventory item keyed by the product ID."""
+        result = InventoryEventsService.handle_product_created({'data': {'productId': 'EVENT-SKU-001'}})
+        
+        assert result['status'] == 'success'
+        item = InventoryItem.query.filter_by(sku='EVENT-SKU-001').one()
+        assert item.quantity_available == 0
+        assert item.quantity_reserved == 0
+        event_publisher.publish_inventory_created.assert_called_once_with(
+            product_id='EVENT-SKU-001', initial_quantity=0, correlation_id=None
+        )
+    
+    def test_product_created_duplicate(self, db_session, event_publisher):
+        """Test a repeated product.created event is skipped."""
+        create_test_inventory_item(db_session, sku='EVENT-SKU-002', quantity_available=7)
+        # The handler rolls back the rejected insert; keep the item out of the rolled-back savepoint
+        db_session.commit()
+        
+        result = InventoryEventsService.handle_product_created({'data': {'productId': 'EVENT-SKU-002'}})
+        
+        assert result['status'] == 'skipped'
+        assert InventoryItem.query.filter_by(sku='EVENT-SKU-002').one().quantity_available == 7
+        event_publisher.publish_inventory_created.assert_not_called()
+    
+    def test_product_created_integrity_error(self, db_session, event_publisher):
+        """Test integrity errors other than a duplicate SKU are reported, not skipped."""
+        error = IntegrityError('INSERT', {}, Exception(1048, "Column 'sku' cannot be null"))
+        
+        with patch.object(db_session, 'commit', side_effect=error):
+            result = InventoryEventsService.handle_product_created({'data': {'productId': 'EVENT-SKU-003'}})
+        
+        assert result['status'] == 'error'
+        event_publisher.publish_inventory_created.assert_not_called()
+    
+    def test_product_created_missing_product_id(self, db_session, event_publisher):
+        """Test product.created without a productId is rejected."""
+        result = InventoryEventsService.handle_product_created({'data': {}})
+        
+        assert result['status'] == 'error'
+        assert 'productId' in result['message']
+    
+    def test_order_created(self, db_session, event_publisher):
+        """Test order.created reserves stock for every line, merging repeated SKUs."""
+        item = create_test_inventory_item(db_session, sku='EVENT-SKU-010', quantity_available=10)
+        
+        result = InventoryEventsService.handle_order_created({'data': {
+            'orderId': 'ORDER-EVENT-010',
+            'items': [
+                {'productId': 'EVENT-SKU-010', 'quantity': 3},
+                {'productId': 'EVENT-SKU-010', 'quantity': 2},
+            ]
+        }})
+        
+        assert result['status'] == 'success'
+        assert len(result['reservations']) == 2
+        db_session.refresh(item)
+        assert item.quantity_available == 5
+        assert item.quantity_reserved == 5
+        reservations = Reservation.query.filter_by(order_id='ORDER-EVENT-010').all()
+        assert sorted(r.quantity for r in reservations) == [2, 3]
+        assert all(r.sku == 'EVENT-SKU-010' for r in reservations)
+        assert all(r.status == ReservationStatus.PENDING for r in reservations)
+        event_publisher.publish_in_background.assert_called_once()
+    
+    @pytest.mark.parametrize('items, message', [
+        ([{'productId': 'EVENT-SKU-011', 'quantity': 4}, {'productId': 'EVENT-SKU-011', 'quantity': 2}],
+         'Insufficient stock'),
+        ([{'productId': 'EVENT-SKU-011', 'quantity': 1}, {'productId': 'EVENT-MISSING', 'quantity': 1}],
+         'not found'),
+    ])
+    def test_order_created_rejected(self, db_session, event_publisher, items, message):
+        """Test order.created reserves nothing when any line cannot be satisfied."""
+        create_test_inventory_item(db_session, sku='EVENT-SKU-011', quantity_available=5)
+        # The handler rolls back on rejection; keep the item out of the rolled-back savepoint
+        db_session.commit()
+        
+        result = InventoryEventsService.handle_order_created({'data': {
+            'orderId': 'ORDER-EVENT-011', 'items': items
+        }})
+        
+        assert result['status'] == 'error'
+        assert message in result['message']
+        item = InventoryItem.query.filter_by(sku='EVENT-SKU-011').one()
+        assert item.quantity_available == 5
+        assert item.quantity_reserved == 0
+        assert Reservation.query.filter_by(order_id='ORDER-EVENT-011').count() == 0
+        event_publisher.publish_in_background.assert_not_called()
+    
+    def test_order_cancelled(self, db_session, event_publisher):
+        """Test order.cancelled returns reserved stock to available."""
+        item = create_test_inventory_item(
+            db_session, sku='EVENT-SKU-012', quantity_available=6, quantity_reserved=4
+        )
+        reservation = create_test_reservation(
+            db_session, item, order_id='ORDER-EVENT-012', quantity=4
+        )
+        
+        result = InventoryEventsService.handle_order_cancelled({'data': {'orderId': 'ORDER-EVENT-012'}})
+        
+        assert result['status'] == 'success'
+        assert item.quantity_available == 10
+        assert item.quantity_reserved == 0
+        assert reservation.status == ReservationStatus.RELEASED
+    
+    def test_order_completed(self, db_session, event_publisher):
+        """Test order.completed confirms reservations without touching available stock again."""
+        item = create_test_inventory_item(
+            db_session, sku='EVENT-SKU-013', quantity_available=6, quantity_reserved=4
+        )
+        reservation = create_test_reservation(
+            db_session, item, order_id='ORDER-EVENT-013', quantity=4
+        )
+        
+        result = InventoryEventsService.handle_order_completed({'data': {'orderId': 'ORDER-EVENT-013'}})
+        
+        assert result['status'] == 'success'
+        assert item.quantity_available == 6
+        assert item.quantity_reserved == 0
+        assert reservation.status == ReservationStatus.CONFIRMED